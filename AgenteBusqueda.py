@@ -12,13 +12,29 @@ Salida:
 - Camino óptimo encontrado
 - Número de nodos explorados (expansiones)
 - Tiempo de ejecución
-- Trazas paso a paso de la exploración (verbose=True)
+- Trazas paso a paso de la exploración (verbose=True o un SearchTracer)
 """
+import csv
+import json
 import math
 import heapq
+import mmap
+import operator
+import random
+import struct
+import sys
 import time
-from dataclasses import dataclass
-from typing import Dict, Tuple, List, Optional, Iterable
+from array import array
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Collection, Dict, Tuple, List, Mapping, NamedTuple, Optional, Iterable, Sequence, Union
+import multiprocessing
+from collections import OrderedDict, deque
+from collections.abc import Mapping as _AbcMapping, Sequence as _AbcSequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: solo lo usan WindField y frontier_bfs
+    np = None
 
 
 Coord = Tuple[float, float]
@@ -32,41 +48,998 @@ class Edge:
     wind: float = 0.0  # penalización no negativa
 
 
+class SpatialIndex:
+    """
+    Índice espacial de cubetas uniformes sobre las coordenadas de los nodos.
+
+    Cada nodo cae en la celda (floor(x / cell), floor(y / cell)); las consultas recorren anillos
+    de celdas alrededor del punto y se detienen cuando el anillo ya no puede contener nada más
+    cercano. Con ~1 nodo por celda, nearest/k_nearest cuestan O(k) celdas en lugar de O(n).
+    """
+
+    def __init__(self, cell_size: float) -> None:
+        if not cell_size > 0:
+            raise ValueError("El tamaño de celda debe ser positivo")
+        self.cell_size = float(cell_size)
+        self._buckets: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = {}
+        self._count = 0
+        # Extensión de celdas ocupadas (para saber cuándo dejar de expandir anillos)
+        self._min_cx = self._min_cy = 0
+        self._max_cx = self._max_cy = -1
+
+    @classmethod
+    def build(cls, points: Iterable[Tuple[str, float, float]], cell_size: Optional[float] = None) -> "SpatialIndex":
+        """Construye el índice; sin cell_size se elige para tener ~1 nodo por celda."""
+        points = list(points)
+        if cell_size is None:
+            cell_size = 1.0
+            if len(points) > 1:
+                width = max(p[1] for p in points) - min(p[1] for p in points)
+                height = max(p[2] for p in points) - min(p[2] for p in points)
+                if width > 0 and height > 0:
+                    cell_size = math.sqrt(width * height / len(points))
+                elif width > 0 or height > 0:
+                    cell_size = max(width, height) / len(points)
+        index = cls(cell_size)
+        for name, x, y in points:
+            index.insert(name, x, y)
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, name: str, x: float, y: float) -> None:
+        cx, cy = self._cell(x, y)
+        self._buckets.setdefault((cx, cy), []).append((name, float(x), float(y)))
+        if self._count:
+            self._min_cx, self._max_cx = min(self._min_cx, cx), max(self._max_cx, cx)
+            self._min_cy, self._max_cy = min(self._min_cy, cy), max(self._max_cy, cy)
+        else:
+            self._min_cx = self._max_cx = cx
+            self._min_cy = self._max_cy = cy
+        self._count += 1
+
+    def remove(self, name: str, x: float, y: float) -> None:
+        """Quita un nodo insertado con esas coordenadas (la extensión ocupada no se achica)."""
+        cell = self._cell(x, y)
+        bucket = self._buckets.get(cell, [])
+        for i, entry in enumerate(bucket):
+            if entry[0] == name:
+                del bucket[i]
+                if not bucket:
+                    del self._buckets[cell]
+                self._count -= 1
+                return
+        raise ValueError(f"Nodo no encontrado en el índice espacial: {name}")
+
+    def _rings(self, x: float, y: float) -> Iterable[Tuple[int, List[Tuple[str, float, float]]]]:
+        """Genera (r, puntos del anillo r) en distancia de Chebyshev creciente desde la celda de (x, y)."""
+        if not self._count:
+            return
+        qx, qy = self._cell(x, y)
+        min_cx, max_cx, min_cy, max_cy = self._min_cx, self._max_cx, self._min_cy, self._max_cy
+        # Los anillos que no tocan la extensión ocupada están vacíos: se salta hasta el primero que sí
+        first = max(min_cx - qx, qx - max_cx, min_cy - qy, qy - max_cy, 0)
+        last = max(qx - min_cx, max_cx - qx, qy - min_cy, max_cy - qy)
+        buckets = self._buckets
+        for r in range(first, last + 1):
+            found: List[Tuple[str, float, float]] = []
+            x_lo, x_hi = max(qx - r, min_cx), min(qx + r, max_cx)
+            if qy - r >= min_cy:
+                for cx in range(x_lo, x_hi + 1):
+                    found.extend(buckets.get((cx, qy - r), ()))
+            if r and qy + r <= max_cy:
+                for cx in range(x_lo, x_hi + 1):
+                    found.extend(buckets.get((cx, qy + r), ()))
+            y_lo, y_hi = max(qy - r + 1, min_cy), min(qy + r - 1, max_cy)
+            if r and qx - r >= min_cx:
+                for cy in range(y_lo, y_hi + 1):
+                    found.extend(buckets.get((qx - r, cy), ()))
+            if r and qx + r <= max_cx:
+                for cy in range(y_lo, y_hi + 1):
+                    found.extend(buckets.get((qx + r, cy), ()))
+            yield r, found
+
+    def k_nearest(self, x: float, y: float, k: int) -> List[Tuple[str, float]]:
+        """Los k nodos más cercanos a (x, y) como [(nombre, distancia)], del más cercano al más lejano."""
+        if k <= 0:
+            return []
+        best: List[Tuple[float, int, str]] = []  # max-heap por distancia (negada)
+        tie = 0
+        for r, found in self._rings(x, y):
+            for name, px, py in found:
+                d = math.hypot(px - x, py - y)
+                tie += 1
+                if len(best) < k:
+                    heapq.heappush(best, (-d, -tie, name))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, -tie, name))
+            # Todo lo que queda está en anillos > r, a distancia >= r * cell_size
+            if len(best) == k and -best[0][0] <= r * self.cell_size:
+                break
+        return [(name, -neg_d) for neg_d, _, name in sorted(best, reverse=True)]
+
+    def nearest(self, x: float, y: float) -> Tuple[str, float]:
+        """Nodo más cercano a (x, y) y su distancia euclidiana."""
+        result = self.k_nearest(x, y, 1)
+        if not result:
+            raise ValueError("El índice espacial está vacío")
+        return result[0]
+
+    def within(self, x: float, y: float, radius: float) -> List[Tuple[str, float]]:
+        """Nodos a distancia <= radius de (x, y), ordenados por distancia."""
+        found: List[Tuple[float, str]] = []
+        for r, ring in self._rings(x, y):
+            if (r - 1) * self.cell_size > radius:
+                break
+            for name, px, py in ring:
+                d = math.hypot(px - x, py - y)
+                if d <= radius:
+                    found.append((d, name))
+        found.sort()
+        return [(name, d) for d, name in found]
+
+
 class CityGraph:
     def __init__(self, coords: Dict[str, Coord], lambda_w: float = 1.0, undirected: bool = True) -> None:
         self.coords: Dict[str, Coord] = coords
-        self.lambda_w: float = float(lambda_w)
+        self._lambda_w: float = float(lambda_w)
         self.undirected: bool = undirected
         # adjacency[u][v] = wind_penalty
         self.adjacency: Dict[str, Dict[str, float]] = {n: {} for n in coords}
+        # costs[u][v] = euclidiana(u, v) + λ_w * viento(u, v), mismo orden que adjacency
+        self.costs: Dict[str, Dict[str, float]] = {n: {} for n in coords}
+        # reverse_costs[v][u] = costs[u][v] (en grafos no dirigidos es el mismo diccionario)
+        self.reverse_costs: Dict[str, Dict[str, float]] = self.costs if undirected else {n: {} for n in coords}
+        # Se incrementa con cada cambio de aristas o de λ_w (invalida cachés de rutas)
+        self.version: int = 0
+        # Índice espacial perezoso (spatial_index); add_node lo mantiene al día
+        self._spatial: Optional[SpatialIndex] = None
+        # Última forma compacta con las versiones (grafo, compacto) con que se armó (_compiled)
+        self._compact_cache: Optional[Tuple[int, "CompactGraph", int]] = None
+
+    @property
+    def lambda_w(self) -> float:
+        return self._lambda_w
+
+    @lambda_w.setter
+    def lambda_w(self, value: float) -> None:
+        self._lambda_w = float(value)
+        self.rebuild_costs()
+
+    def spatial_index(self) -> SpatialIndex:
+        """Índice espacial sobre coords (se construye en el primer uso)."""
+        if self._spatial is None or len(self._spatial) != len(self.coords):
+            self._spatial = SpatialIndex.build((n, x, y) for n, (x, y) in self.coords.items())
+        return self._spatial
+
+    def add_node(self, name: str, x: float, y: float) -> None:
+        """Agrega una intersección sin aristas; el índice espacial, si existe, se actualiza."""
+        if name in self.coords:
+            raise ValueError(f"El nodo ya existe: {name}")
+        self.coords[name] = (float(x), float(y))
+        self.adjacency[name] = {}
+        self.costs[name] = {}
+        if not self.undirected:
+            self.reverse_costs[name] = {}
+        self.version += 1
+        if self._spatial is not None:
+            self._spatial.insert(name, float(x), float(y))
+
+    def rebuild_costs(self) -> None:
+        """Recalcula la tabla de costos completa (tras cambiar λ_w o editar adjacency a mano)."""
+        self.version += 1
+        lam = self._lambda_w
+        self.costs = {
+            u: {v: self.euclidean(u, v) + lam * wind for v, wind in row.items()}
+            for u, row in self.adjacency.items()
+        }
+        if self.undirected:
+            self.reverse_costs = self.costs
+        else:
+            self.reverse_costs = {n: {} for n in self.coords}
+            for u, row in self.costs.items():
+                for v, c in row.items():
+                    self.reverse_costs[v][u] = c
 
     def add_edge(self, u: str, v: str, wind: float = 0.0) -> None:
         if u not in self.coords or v not in self.coords:
             raise ValueError(f"Nodo inexistente en coords: {u} o {v}")
         if wind < 0:
             raise ValueError("La penalización de viento debe ser no negativa")
+        c = self.euclidean(u, v) + self._lambda_w * float(wind)
+        self.version += 1
         self.adjacency[u][v] = float(wind)
+        self.costs[u][v] = c
         if self.undirected:
             self.adjacency[v][u] = float(wind)
+            self.costs[v][u] = c
+        else:
+            self.reverse_costs[v][u] = c
+
+    def add_edges(self, edges: Iterable[Tuple[str, str, float]]) -> int:
+        """
+        Agrega aristas (u, v, viento) en bloque con las mismas validaciones que add_edge,
+        pero sin llamadas por arista ni un cambio de versión por cada una. Devuelve cuántas agregó.
+        """
+        coords, adjacency, costs, reverse_costs = self.coords, self.adjacency, self.costs, self.reverse_costs
+        lam, undirected, hypot = self._lambda_w, self.undirected, math.hypot
+        count = 0
+        try:
+            for u, v, wind in edges:
+                cu, cv = coords.get(u), coords.get(v)
+                if cu is None or cv is None:
+                    raise ValueError(f"Nodo inexistente en coords: {u} o {v}")
+                wind = float(wind)
+                if wind < 0:
+                    raise ValueError("La penalización de viento debe ser no negativa")
+                c = hypot(cu[0] - cv[0], cu[1] - cv[1]) + lam * wind
+                adjacency[u][v] = wind
+                costs[u][v] = c
+                if undirected:
+                    adjacency[v][u] = wind
+                    costs[v][u] = c
+                else:
+                    reverse_costs[v][u] = c
+                count += 1
+        finally:
+            # Aun si falla a mitad, las aristas ya insertadas cuentan como un cambio del grafo
+            self.version += 1
+        return count
 
     def neighbors(self, u: str) -> Iterable[str]:
         return self.adjacency[u].keys()
 
+    def predecessors(self, v: str) -> Iterable[str]:
+        return self.reverse_costs[v].keys()
+
     def euclidean(self, a: str, b: str) -> float:
         (x1, y1), (x2, y2) = self.coords[a], self.coords[b]
         return math.hypot(x1 - x2, y1 - y2)
 
     def cost(self, u: str, v: str) -> float:
-        if v not in self.adjacency[u]:
-            raise ValueError(f"Arista restringida o inexistente: {u}->{v}")
-        base = self.euclidean(u, v)
-        wind_penalty = self.adjacency[u][v]
-        return base + self.lambda_w * wind_penalty
+        try:
+            return self.costs[u][v]
+        except KeyError:
+            raise ValueError(f"Arista restringida o inexistente: {u}->{v}") from None
 
     def h(self, s: str, goal: str) -> float:
         # Heurística euclidiana (admisible al ignorar viento, consistente en grafos con costos no negativos)
         return self.euclidean(s, goal)
 
+    def compile(self) -> "CompactGraph":
+        """Congela el grafo en su forma compacta (ids enteros + arreglos CSR)."""
+        return CompactGraph.from_city_graph(self)
+
+    def _compiled(self) -> "CompactGraph":
+        """Forma compacta compartida entre llamadas mientras ni el grafo ni ella cambien de versión."""
+        cached = self._compact_cache
+        if cached is None or cached[0] != self.version or cached[1].version != cached[2]:
+            compact = self.compile()
+            cached = self._compact_cache = (self.version, compact, compact.version)
+        return cached[1]
+
+
+class CompactGraph:
+    """
+    Forma compilada (inmutable) de CityGraph para mapas con muchos nodos.
+
+    - Nodos con ids enteros 0..n-1 en el orden de inserción de `coords`.
+    - Coordenadas en arreglos contiguos de float: xs[i], ys[i].
+    - Adyacencia CSR: las aristas de u ocupan las posiciones offsets[u]..offsets[u+1]-1
+      de `targets` (vecino), `winds` (penalización de viento) y `costs` (costo ya combinado).
+    - La tabla nombre<->id solo se usa en la frontera (entrada y salida de las búsquedas); nombre->id
+      es una búsqueda binaria sobre ids ordenados por nombre (4 bytes por nodo, sin dict).
+    - Los vientos se guardan en float32 cuando todos son representables exactamente (lo usual: 0 o
+      valores redondos), así los costos recalculados con otro λ_w no cambian.
+    """
+
+    __slots__ = (
+        "names", "_index", "xs", "ys", "offsets", "targets", "winds", "costs", "_lambda_w", "undirected", "_reverse",
+        "version", "_spatial",
+    )
+
+    def __init__(
+        self,
+        names: List[str],
+        xs: array,
+        ys: array,
+        offsets: array,
+        targets: array,
+        winds: array,
+        lambda_w: float = 1.0,
+        undirected: bool = True,
+        costs: Optional[array] = None,
+    ) -> None:
+        if len(xs) != len(names) or len(ys) != len(names) or len(offsets) != len(names) + 1:
+            raise ValueError("Arreglos de nodos inconsistentes con la tabla de nombres")
+        if len(targets) != len(winds) or offsets[-1] != len(targets):
+            raise ValueError("Arreglos CSR inconsistentes")
+        self.names: List[str] = names
+        self._index: Optional[Dict[str, int]] = None
+        self.xs = xs
+        self.ys = ys
+        self.offsets = offsets
+        self.targets = targets
+        self.winds = _narrow_winds(winds)
+        self._lambda_w: float = float(lambda_w)
+        self.undirected: bool = undirected
+        self._reverse: Optional[Tuple[array, array, array]] = None
+        self.version: int = 0
+        self._spatial: Optional[SpatialIndex] = None
+        if costs is None:
+            self.rebuild_costs()
+        else:
+            if len(costs) != len(targets):
+                raise ValueError("Arreglo de costos inconsistente con las aristas")
+            self.costs = costs
+
+    @classmethod
+    def from_city_graph(cls, graph: CityGraph) -> "CompactGraph":
+        names = list(graph.coords)
+        index = {n: i for i, n in enumerate(names)}
+        xs, ys = array("d"), array("d")
+        offsets, targets, winds, costs = array("q", [0]), array("i"), array("d"), array("d")
+        for n in names:
+            x, y = graph.coords[n]
+            xs.append(x)
+            ys.append(y)
+            row_costs = graph.costs[n]
+            for v, w in graph.adjacency[n].items():
+                targets.append(index[v])
+                winds.append(w)
+                costs.append(row_costs[v])
+            offsets.append(len(targets))
+        compact = cls(names, xs, ys, offsets, targets, winds, graph.lambda_w, graph.undirected, costs)
+        compact.version = graph.version
+        return compact
+
+    def to_city_graph(self) -> CityGraph:
+        """Reconstruye un CityGraph editable (para volver a agregar aristas)."""
+        coords = {n: (self.xs[i], self.ys[i]) for i, n in enumerate(self.names)}
+        graph = CityGraph(coords, lambda_w=self.lambda_w, undirected=self.undirected)
+        for u, n in enumerate(self.names):
+            row = graph.adjacency[n]
+            for k in range(self.offsets[u], self.offsets[u + 1]):
+                row[self.names[self.targets[k]]] = self.winds[k]
+        graph.rebuild_costs()
+        return graph
+
+    @property
+    def lambda_w(self) -> float:
+        return self._lambda_w
+
+    @lambda_w.setter
+    def lambda_w(self, value: float) -> None:
+        self._lambda_w = float(value)
+        self.rebuild_costs()
+
+    def rebuild_costs(self) -> None:
+        self.version += 1
+        xs, ys, targets, winds, lam = self.xs, self.ys, self.targets, self.winds, self._lambda_w
+        costs = array("d", bytes(8 * len(targets)))
+        for u in range(len(self.names)):
+            ux, uy = xs[u], ys[u]
+            for k in range(self.offsets[u], self.offsets[u + 1]):
+                v = targets[k]
+                costs[k] = math.hypot(ux - xs[v], uy - ys[v]) + lam * winds[k]
+        self.costs = costs
+        self._reverse = None
+
+    @property
+    def index(self) -> Mapping[str, int]:
+        # La tabla nombre->id se construye solo cuando hace falta: ids ordenados por nombre + búsqueda binaria
+        if self._index is None:
+            names = self.names
+            self._index = _SortedNameIndex(names, array("i", sorted(range(len(names)), key=names.__getitem__)))
+        return self._index
+
+    def spatial_index(self) -> SpatialIndex:
+        """Índice espacial sobre xs/ys (el grafo compacto no cambia de nodos, se construye una vez)."""
+        if self._spatial is None:
+            names, xs, ys = self.names, self.xs, self.ys
+            self._spatial = SpatialIndex.build((names[i], xs[i], ys[i]) for i in range(len(names)))
+        return self._spatial
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados por los arreglos numéricos (sin contar la tabla de nombres)."""
+        arrays = (self.xs, self.ys, self.offsets, self.targets, self.winds, self.costs)
+        return sum(len(a) * a.itemsize for a in arrays)
+
+    def node_id(self, name: str) -> int:
+        try:
+            return self.index[name]
+        except KeyError:
+            raise ValueError(f"Nodo inexistente en el grafo: {name}") from None
+
+    def _edge_pos(self, u: int, v: int) -> int:
+        # Solo se recorre la fila CSR de u (grado de u), con la búsqueda en C de operator.indexOf
+        a = self.offsets[u]
+        try:
+            return a + operator.indexOf(self.targets[a:self.offsets[u + 1]], v)
+        except ValueError:
+            return -1
+
+    # Interfaz por ids (la usan los algoritmos internamente)
+    def out_edges(self, u: int) -> Iterable[Tuple[int, float]]:
+        a, b = self.offsets[u], self.offsets[u + 1]
+        return zip(self.targets[a:b], self.costs[a:b])
+
+    def in_edges(self, v: int) -> Iterable[Tuple[int, float]]:
+        if self.undirected:
+            return self.out_edges(v)
+        offsets, sources, costs = self._reverse_csr()
+        a, b = offsets[v], offsets[v + 1]
+        return zip(sources[a:b], costs[a:b])
+
+    def _reverse_csr(self) -> Tuple[array, array, array]:
+        # CSR transpuesto (aristas entrantes), construido una sola vez por ordenamiento por conteo
+        if self._reverse is None:
+            n = len(self.names)
+            offsets = array("q", bytes(8 * (n + 1)))
+            for v in self.targets:
+                offsets[v + 1] += 1
+            for i in range(n):
+                offsets[i + 1] += offsets[i]
+            fill = array("q", offsets)
+            sources = array("i", bytes(4 * len(self.targets)))
+            costs = array("d", bytes(8 * len(self.targets)))
+            for u in range(n):
+                for k in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[k]
+                    pos = fill[v]
+                    sources[pos] = u
+                    costs[pos] = self.costs[k]
+                    fill[v] = pos + 1
+            self._reverse = (offsets, sources, costs)
+        return self._reverse
+
+    def h_ids(self, a: int, b: int) -> float:
+        return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+
+    # Interfaz por nombres (compatibilidad con CityGraph en la frontera)
+    def neighbors(self, u: str) -> Iterable[str]:
+        i = self.node_id(u)
+        return [self.names[self.targets[k]] for k in range(self.offsets[i], self.offsets[i + 1])]
+
+    def euclidean(self, a: str, b: str) -> float:
+        i, j = self.node_id(a), self.node_id(b)
+        return math.hypot(self.xs[i] - self.xs[j], self.ys[i] - self.ys[j])
+
+    def cost(self, u: str, v: str) -> float:
+        i, j = self.node_id(u), self.node_id(v)
+        k = self._edge_pos(i, j)
+        if k < 0:
+            raise ValueError(f"Arista restringida o inexistente: {u}->{v}")
+        return self.costs[k]
+
+    def h(self, s: str, goal: str) -> float:
+        return self.euclidean(s, goal)
+
+
+# -----------------------------
+# Construcción masiva y carga desde disco
+# -----------------------------
+def build_grid(
+    width: int,
+    height: int,
+    lambda_w: float = 1.0,
+    diagonals: str = "none",
+    restricted: Union[Collection[frozenset], Callable[[str, str], bool], None] = None,
+    wind: Union[Mapping[frozenset, float], Callable[[str, str], float], None] = None,
+    name: Optional[Callable[[int, int], str]] = None,
+    spacing: float = 1.0,
+    undirected: bool = True,
+) -> CityGraph:
+    """
+    Malla width x height con calles ortogonales y atajos diagonales opcionales.
+
+    - diagonals: "none", "main" ((x, y)-(x+1, y+1)) o "both" (agrega también (x+1, y)-(x, y+1)).
+    - restricted: pares frozenset({u, v}) o función (u, v) -> bool; esas calles no se agregan.
+    - wind: mapa frozenset({u, v}) -> viento o función (u, v) -> viento (0 si falta).
+    - name: etiqueta de cada nodo a partir de (x, y); por defecto "x_y".
+    Las aristas se insertan por filas (horizontales), luego por columnas (verticales) y al final
+    las diagonales, el mismo orden en que se describía la malla de la demo a mano.
+    """
+    if diagonals not in ("none", "main", "both"):
+        raise ValueError(f"diagonals debe ser 'none', 'main' o 'both', no {diagonals!r}")
+    label = name if name is not None else (lambda x, y: f"{x}_{y}")
+    names = [[label(x, y) for x in range(width)] for y in range(height)]
+    coords: Dict[str, Coord] = {
+        names[y][x]: (x * spacing, y * spacing) for y in range(height) for x in range(width)
+    }
+    graph = CityGraph(coords, lambda_w=lambda_w, undirected=undirected)
+
+    if restricted is None:
+        is_restricted: Callable[[str, str], bool] = lambda u, v: False
+    elif callable(restricted):
+        is_restricted = restricted
+    else:
+        blocked = set(restricted)
+        is_restricted = lambda u, v: frozenset((u, v)) in blocked
+    if wind is None:
+        wind_of: Callable[[str, str], float] = lambda u, v: 0.0
+    elif callable(wind):
+        wind_of = wind
+    else:
+        wind_of = lambda u, v: wind.get(frozenset((u, v)), 0.0)
+
+    def pairs() -> Iterable[Tuple[str, str]]:
+        for y in range(height):
+            for x in range(width - 1):
+                yield names[y][x], names[y][x + 1]
+        for x in range(width):
+            for y in range(height - 1):
+                yield names[y][x], names[y + 1][x]
+        if diagonals != "none":
+            for y in range(height - 1):
+                for x in range(width - 1):
+                    yield names[y][x], names[y + 1][x + 1]
+                    if diagonals == "both":
+                        yield names[y][x + 1], names[y + 1][x]
+
+    graph.add_edges((u, v, wind_of(u, v)) for u, v in pairs() if not is_restricted(u, v))
+    return graph
+
+
+def _narrow_winds(winds):
+    """Pasa los vientos a float32 si todos se representan exactamente (la mitad de memoria, mismos costos)."""
+    if not isinstance(winds, array) or winds.typecode != "d":
+        return winds
+    narrow = array("f", winds)
+    return narrow if narrow.tolist() == winds.tolist() else winds
+
+
+def _compact_from_edge_arrays(
+    names: List[str],
+    xs: array,
+    ys: array,
+    us: array,
+    vs: array,
+    ws: array,
+    lambda_w: float,
+    undirected: bool,
+) -> CompactGraph:
+    """Arma el CSR por ordenamiento por conteo a partir de listas de aristas (u, v, viento) en arreglos."""
+    n = len(names)
+    offsets = array("q", bytes(8 * (n + 1)))
+    for u in us:
+        offsets[u + 1] += 1
+    if undirected:
+        for v in vs:
+            offsets[v + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    total = offsets[n]
+    fill = array("q", offsets)
+    targets = array("i", bytes(4 * total))
+    winds = array("d", bytes(8 * total))
+    for u, v, w in zip(us, vs, ws):
+        pos = fill[u]
+        targets[pos] = v
+        winds[pos] = w
+        fill[u] = pos + 1
+        if undirected:
+            pos = fill[v]
+            targets[pos] = u
+            winds[pos] = w
+            fill[v] = pos + 1
+    return CompactGraph(names, xs, ys, offsets, targets, winds, lambda_w, undirected)
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterable[List[tuple]]:
+    chunk: List[tuple] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_csv(
+    nodes_path: str,
+    edges_path: str,
+    lambda_w: float = 1.0,
+    undirected: bool = True,
+    compact: bool = False,
+    chunk_size: int = 100_000,
+) -> Union[CityGraph, CompactGraph]:
+    """
+    Carga un grafo desde dos CSV con cabecera: nodos (nombre,x,y) y aristas (u,v[,viento]).
+    Las aristas se leen por bloques de chunk_size; con compact=True se arman directamente los
+    arreglos CSR sin pasar por los diccionarios de CityGraph.
+    """
+    coords: Dict[str, Coord] = {}
+    with open(nodes_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if row:
+                coords[row[0]] = (float(row[1]), float(row[2]))
+
+    with open(edges_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        rows = ((row[0], row[1], float(row[2]) if len(row) > 2 and row[2] != "" else 0.0) for row in reader if row)
+        if not compact:
+            graph = CityGraph(coords, lambda_w=lambda_w, undirected=undirected)
+            for chunk in _chunks(rows, chunk_size):
+                graph.add_edges(chunk)
+            return graph
+
+        names = list(coords)
+        index = {n: i for i, n in enumerate(names)}
+        xs = array("d", (coords[n][0] for n in names))
+        ys = array("d", (coords[n][1] for n in names))
+        us, vs, ws = array("i"), array("i"), array("d")
+        for chunk in _chunks(rows, chunk_size):
+            for u, v, w in chunk:
+                if u not in index or v not in index:
+                    raise ValueError(f"Nodo inexistente en coords: {u} o {v}")
+                if w < 0:
+                    raise ValueError("La penalización de viento debe ser no negativa")
+                us.append(index[u])
+                vs.append(index[v])
+                ws.append(w)
+    return _compact_from_edge_arrays(names, xs, ys, us, vs, ws, lambda_w, undirected)
+
+
+# Lista binaria de aristas (columnar): cabecera, nombres (utf-8 separados por "\n"), xs[n], ys[n],
+# y luego las columnas us[m] (int32), vs[m] (int32) y winds[m] (float64)
+_EDGE_LIST_MAGIC = b"CGEL1\0"
+_EDGE_LIST_HEADER = struct.Struct("<qqd?")
+
+
+def save_edge_list(graph: Union[CityGraph, CompactGraph], path: str) -> None:
+    """Escribe el grafo como lista binaria de aristas (cada calle no dirigida se guarda una vez)."""
+    compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+    us, vs, ws = array("i"), array("i"), array("d")
+    offsets, targets, winds = compact.offsets, compact.targets, compact.winds
+    for u in range(len(compact)):
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if compact.undirected and v < u:
+                continue
+            us.append(u)
+            vs.append(v)
+            ws.append(winds[k])
+    names_blob = "\n".join(compact.names).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(_EDGE_LIST_MAGIC)
+        f.write(_EDGE_LIST_HEADER.pack(len(compact), len(us), compact.lambda_w, compact.undirected))
+        f.write(struct.pack("<q", len(names_blob)))
+        f.write(names_blob)
+        array("d", compact.xs).tofile(f)
+        array("d", compact.ys).tofile(f)
+        us.tofile(f)
+        vs.tofile(f)
+        ws.tofile(f)
+
+
+def load_edge_list(
+    path: str,
+    lambda_w: Optional[float] = None,
+    compact: bool = True,
+    chunk_size: int = 1 << 16,
+) -> Union[CityGraph, CompactGraph]:
+    """
+    Lee una lista binaria de aristas por bloques de chunk_size aristas (memoria acotada por bloque).
+    Por defecto devuelve un CompactGraph; con compact=False, un CityGraph editable.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_EDGE_LIST_MAGIC)) != _EDGE_LIST_MAGIC:
+            raise ValueError(f"{path} no es una lista binaria de aristas")
+        n, m, stored_lambda, undirected = _EDGE_LIST_HEADER.unpack(f.read(_EDGE_LIST_HEADER.size))
+        lam = stored_lambda if lambda_w is None else lambda_w
+        (names_len,) = struct.unpack("<q", f.read(8))
+        names = f.read(names_len).decode("utf-8").split("\n") if n else []
+        xs, ys = array("d"), array("d")
+        xs.fromfile(f, n)
+        ys.fromfile(f, n)
+        base = f.tell()
+        columns = ((base, "i"), (base + 4 * m, "i"), (base + 8 * m, "d"))
+
+        def read_chunk(column: Tuple[int, str], start: int, count: int) -> array:
+            pos, code = column
+            chunk = array(code)
+            f.seek(pos + start * chunk.itemsize)
+            try:
+                chunk.fromfile(f, count)
+            except EOFError:
+                raise ValueError(f"{path} está truncado") from None
+            return chunk
+
+        if compact:
+            us, vs, ws = array("i"), array("i"), array("d")
+            for start in range(0, m, chunk_size):
+                count = min(chunk_size, m - start)
+                cu, cv, cw = (read_chunk(col, start, count) for col in columns)
+                if min(cu) < 0 or min(cv) < 0 or max(cu) >= n or max(cv) >= n:
+                    raise ValueError("Arista con nodo fuera de rango en la lista binaria")
+                if min(cw) < 0:
+                    raise ValueError("La penalización de viento debe ser no negativa")
+                us.extend(cu)
+                vs.extend(cv)
+                ws.extend(cw)
+            return _compact_from_edge_arrays(names, xs, ys, us, vs, ws, lam, undirected)
+
+        graph = CityGraph({name: (xs[i], ys[i]) for i, name in enumerate(names)}, lambda_w=lam, undirected=undirected)
+        for start in range(0, m, chunk_size):
+            count = min(chunk_size, m - start)
+            cu, cv, cw = (read_chunk(col, start, count) for col in columns)
+            graph.add_edges((names[u], names[v], w) for u, v, w in zip(cu, cv, cw))
+        return graph
+
+
+# Snapshot binario: cabecera JSON + secciones alineadas a 8 bytes que se pueden mapear en memoria.
+# Varios procesos que cargan el mismo archivo comparten una sola copia en el page cache.
+_SNAPSHOT_MAGIC = b"CGSNAP1\0"
+
+
+class _SnapshotNames(_AbcSequence):
+    """Tabla de nombres sobre el snapshot: decodifica cada nombre solo cuando se pide."""
+
+    def __init__(self, blob: memoryview, offsets: memoryview) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def raw(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+
+class _SortedNameIndex(_AbcMapping):
+    """nombre -> id por búsqueda binaria sobre los ids ordenados por nombre (sin construir un dict)."""
+
+    def __init__(self, names: Sequence[str], sorted_ids: Sequence[int]) -> None:
+        self._names = names
+        self._sorted = sorted_ids
+
+    def _key(self, name: str):
+        return name
+
+    def _name_key(self, i: int):
+        return self._names[i]
+
+    def __getitem__(self, name: str) -> int:
+        if not isinstance(name, str):
+            raise KeyError(name)
+        key = self._key(name)
+        lo, hi = 0, len(self._sorted)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_key(self._sorted[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._sorted) and self._name_key(self._sorted[lo]) == key:
+            return self._sorted[lo]
+        raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class _SnapshotIndex(_SortedNameIndex):
+    """Igual que _SortedNameIndex pero compara los bytes utf-8 del snapshot sin decodificarlos."""
+
+    def _key(self, name: str):
+        return name.encode("utf-8")
+
+    def _name_key(self, i: int):
+        return self._names.raw(i)
+
+
+def _typecode(data) -> str:
+    return data.typecode if isinstance(data, array) else memoryview(data).format
+
+
+def save_snapshot(
+    graph: Union[CityGraph, CompactGraph],
+    path: str,
+    heuristic: Optional["LandmarkHeuristic"] = None,
+) -> None:
+    """Guarda coordenadas, CSR, vientos, costos, λ_w y (opcional) tablas ALT en un snapshot binario."""
+    compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+    n = len(compact)
+    encoded = [name.encode("utf-8") for name in compact.names]
+    name_offsets = array("q", [0])
+    for raw in encoded:
+        name_offsets.append(name_offsets[-1] + len(raw))
+    sorted_ids = array("i", sorted(range(n), key=encoded.__getitem__))
+
+    sections: List[Tuple[str, str, object]] = [
+        ("names", "B", b"".join(encoded)),
+        ("name_offsets", "q", name_offsets),
+        ("sorted_ids", "i", sorted_ids),
+        ("xs", "d", compact.xs),
+        ("ys", "d", compact.ys),
+        ("offsets", "q", compact.offsets),
+        ("targets", "i", compact.targets),
+        ("winds", _typecode(compact.winds), compact.winds),
+        ("costs", "d", compact.costs),
+    ]
+    header: Dict[str, object] = {
+        "num_nodes": n,
+        "num_edges": compact.num_edges,
+        "lambda_w": compact.lambda_w,
+        "undirected": compact.undirected,
+    }
+    if heuristic is not None:
+        heuristic._check(compact)
+        directed = any(a is not b for a, b in zip(heuristic.dist_from, heuristic.dist_to))
+        header["landmarks"] = {"ids": heuristic.landmarks, "lambda_w": heuristic.lambda_w, "directed": directed}
+        for i, table in enumerate(heuristic.dist_from):
+            sections.append((f"alt_from_{i}", "d", table))
+        if directed:
+            for i, table in enumerate(heuristic.dist_to):
+                sections.append((f"alt_to_{i}", "d", table))
+
+    # Primero se calculan las posiciones (con una cabecera de tamaño fijo reservado) y luego se escribe
+    layout: Dict[str, List[object]] = {}
+    pos = 0
+    for name, code, data in sections:
+        nbytes = memoryview(data).nbytes
+        layout[name] = [pos, code, nbytes]
+        pos += nbytes + (-nbytes % 8)
+    header["sections"] = layout
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-(len(_SNAPSHOT_MAGIC) + 8 + len(header_bytes)) % 8)
+    data_start = len(_SNAPSHOT_MAGIC) + 8 + len(header_bytes)
+
+    with open(path, "wb") as f:
+        f.write(_SNAPSHOT_MAGIC)
+        f.write(struct.pack("<q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, _, data in sections:
+            assert f.tell() == data_start + layout[name][0]
+            view = memoryview(data)
+            f.write(view)
+            f.write(b"\0" * (-view.nbytes % 8))
+
+
+def load_snapshot(path: str, use_mmap: bool = True) -> Tuple[CompactGraph, Optional["LandmarkHeuristic"]]:
+    """
+    Carga un snapshot y devuelve (grafo compacto, heurística ALT o None), listo para astar/bfs.
+    Con use_mmap=True los arreglos son vistas sobre el archivo mapeado (solo lectura, sin copiar).
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} no es un snapshot de CityGraph")
+        (header_len,) = struct.unpack("<q", f.read(8))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+        data_start = len(_SNAPSHOT_MAGIC) + 8 + header_len
+        if use_mmap:
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            f.seek(0)
+            buffer = memoryview(f.read())
+
+    def section(name: str) -> memoryview:
+        offset, code, nbytes = header["sections"][name]
+        start = data_start + offset
+        if start + nbytes > len(buffer):
+            raise ValueError(f"{path} está truncado (sección {name})")
+        return buffer[start:start + nbytes].cast(code)
+
+    names = _SnapshotNames(section("names"), section("name_offsets"))
+    graph = CompactGraph(
+        names,
+        section("xs"),
+        section("ys"),
+        section("offsets"),
+        section("targets"),
+        section("winds"),
+        header["lambda_w"],
+        header["undirected"],
+        section("costs"),
+    )
+    graph._index = _SnapshotIndex(names, section("sorted_ids"))
+
+    heuristic = None
+    landmarks = header.get("landmarks")
+    if landmarks is not None:
+        k = len(landmarks["ids"])
+        dist_from = [section(f"alt_from_{i}") for i in range(k)]
+        dist_to = [section(f"alt_to_{i}") for i in range(k)] if landmarks["directed"] else dist_from
+        # Tablas y grafo salen del mismo archivo: valen para la versión recién cargada
+        heuristic = LandmarkHeuristic(landmarks["ids"], dist_from, dist_to, len(names), landmarks["lambda_w"],
+                                      graph.version)
+    return graph, heuristic
+
+
+@dataclass
+class SearchStats:
+    """
+    Contadores internos de una búsqueda, para seguir la calidad de la heurística y la memoria.
+
+    pushes/pops: operaciones sobre la frontera (heap o cola); stale_pops: extracciones de
+    entradas viejas que se descartan por estar ya cerradas (borrado perezoso).
+    relaxations: aristas que mejoraron g; failed_relaxations: aristas revisadas sin mejora.
+    peak_frontier: tamaño máximo de la frontera; peak_stored_nodes: máximo de nodos distintos con
+    estado guardado (g, padre, ...); peak_memory_bytes: estimación con sys.getsizeof.
+    """
+    pushes: int = 0
+    pops: int = 0
+    stale_pops: int = 0
+    relaxations: int = 0
+    failed_relaxations: int = 0
+    peak_frontier: int = 0
+    peak_stored_nodes: int = 0
+    peak_memory_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+# Bytes aproximados por entrada (f, g, desempate, nodo) del heap: ranura de la lista + tupla + floats + int
+_HEAP_ENTRY_BYTES = 8 + sys.getsizeof((0.0, 0.0, 0, 0)) + 2 * sys.getsizeof(1.0) + sys.getsizeof(1)
+# En BFS la cola guarda solo referencias al nodo (deque ya cuenta sus bloques en getsizeof)
+_QUEUE_ENTRY_BYTES = 8
+
+
+def _search_stats(
+    pushes: int,
+    remaining: int,
+    explored: int,
+    relaxations: int,
+    scanned: int,
+    peak_frontier: int,
+    entry_bytes: int,
+    containers: Sequence[object],
+    stored_nodes: Optional[int] = None,
+) -> SearchStats:
+    """
+    Arma SearchStats a partir de los contadores mínimos que mantiene el bucle de búsqueda.
+    Sin stored_nodes se toma el contenedor por nodo más grande (los bytearray por id no cuentan).
+    """
+    pops = pushes - remaining
+    # g, padres y cerrados solo crecen, así que su tamaño final es también el pico
+    memory = peak_frontier * entry_bytes + sum(sys.getsizeof(c) for c in containers)
+    if stored_nodes is None:
+        stored_nodes = max((len(c) for c in containers if not isinstance(c, (bytearray, array))), default=0)
+    return SearchStats(
+        pushes=pushes,
+        pops=pops,
+        stale_pops=pops - explored,
+        relaxations=relaxations,
+        failed_relaxations=scanned - relaxations,
+        peak_frontier=peak_frontier,
+        peak_stored_nodes=stored_nodes,
+        peak_memory_bytes=memory,
+    )
+
 
 @dataclass
 class SearchResult:
@@ -75,6 +1048,10 @@ class SearchResult:
     explored: int
     runtime_sec: float
     expanded_order: List[str]
+    stats: SearchStats = field(default_factory=SearchStats)
+    # Cota garantizada costo / costo óptimo: 1.0 en búsquedas óptimas, > 1 en A* anytime,
+    # infinito si no hay garantía (BFS ignora los pesos)
+    suboptimality_bound: float = 1.0
 
 
 def reconstruct_path(came_from: Dict[str, str], start: str, goal: str) -> List[str]:
@@ -87,222 +1064,2579 @@ def reconstruct_path(came_from: Dict[str, str], start: str, goal: str) -> List[s
     return path
 
 
+def _dijkstra_ids(
+    graph: "CompactGraph",
+    source: int,
+    reverse: bool = False,
+    targets: Optional[Iterable[int]] = None,
+) -> Tuple[array, Dict[int, int]]:
+    """
+    Dijkstra desde `source` sobre ids del grafo compacto (aristas entrantes si reverse=True).
+    Devuelve (dist, parent); si se pasan `targets`, se detiene al asentarlos todos.
+    """
+    edges = graph.in_edges if reverse else graph.out_edges
+    dist = array("d", [math.inf]) * len(graph)
+    dist[source] = 0.0
+    parent: Dict[int, int] = {}
+    closed = bytearray(len(graph))
+    pending = set(targets) if targets is not None else None
+    heap: List[Tuple[float, int]] = [(0.0, source)]
+    while heap:
+        d_u, u = heapq.heappop(heap)
+        if closed[u]:
+            continue
+        closed[u] = 1
+        if pending is not None:
+            pending.discard(u)
+            if not pending:
+                break
+        for v, c in edges(u):
+            nd = d_u + c
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, parent
+
+
+class Heuristic:
+    """
+    Estrategia de heurística para las búsquedas informadas.
+
+    bind(graph, target) devuelve una función h(v) ya especializada para una meta fija
+    (v es un nombre en CityGraph o un id en CompactGraph). Con reverse=True estima
+    d(target, v) en lugar de d(v, target), para el lado inverso de la búsqueda bidireccional.
+    """
+
+    def bind(self, graph: Union["CityGraph", "CompactGraph"], target, reverse: bool = False) -> Callable[[object], float]:
+        raise NotImplementedError
+
+
+class EuclideanHeuristic(Heuristic):
+    """Distancia euclidiana: admisible y consistente, pero ignora el término λ_w · viento."""
+
+    def bind(self, graph: Union["CityGraph", "CompactGraph"], target, reverse: bool = False) -> Callable[[object], float]:
+        if isinstance(graph, CompactGraph):
+            xs, ys, hypot = graph.xs, graph.ys, math.hypot
+            tx, ty = xs[target], ys[target]
+            return lambda v: hypot(xs[v] - tx, ys[v] - ty)
+        return lambda v: graph.h(v, target)
+
+
+class LandmarkHeuristic(Heuristic):
+    """
+    Heurística ALT (A*, Landmarks, Triangle inequality).
+
+    Para cada landmark L se guardan las distancias exactas d(L, v) y d(v, L) (incluyendo viento);
+    por la desigualdad triangular
+        d(v, t) >= d(L, t) - d(L, v)   y   d(v, t) >= d(v, L) - d(t, L)
+    y el máximo sobre landmarks (y sobre la euclidiana) sigue siendo admisible y consistente.
+    Las tablas son válidas mientras no cambien las aristas ni λ_w del grafo: bind rechaza un
+    grafo con otra versión que la usada en build, y las tablas cargadas de disco comparan la
+    huella del grafo (arcos + suma de costos) guardada en la cabecera.
+    """
+
+    def __init__(
+        self,
+        landmarks: List[int],
+        dist_from: List[array],
+        dist_to: List[array],
+        num_nodes: int,
+        lambda_w: float,
+        version: Optional[int] = None,
+        fingerprint: Optional[Tuple[int, float]] = None,
+    ) -> None:
+        self.landmarks = landmarks
+        self.dist_from = dist_from  # dist_from[i][v] = d(L_i, v)
+        self.dist_to = dist_to  # dist_to[i][v] = d(v, L_i) (mismas tablas si el grafo es no dirigido)
+        self.num_nodes = num_nodes
+        self.lambda_w = lambda_w
+        self.version = version  # versión del grafo en build (None en tablas cargadas de disco)
+        self.fingerprint = fingerprint  # (arcos, suma de costos) del grafo en build
+        # Último grafo validado con su versión y su índice nombre -> id (None si es compacto)
+        self._bound: Optional[Tuple[object, int, Optional[Dict[str, int]]]] = None
+
+    @classmethod
+    def build(cls, graph: Union["CityGraph", "CompactGraph"], k: int = 8, seed: int = 0) -> "LandmarkHeuristic":
+        """Elige k landmarks por selección del más lejano y calcula sus tablas de distancias con Dijkstra."""
+        compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+        n = len(compact)
+        if n == 0 or k <= 0:
+            raise ValueError("Se necesita al menos un nodo y un landmark")
+        k = min(k, n)
+
+        # El primer landmark es el nodo más lejano a uno aleatorio; los siguientes maximizan la
+        # distancia mínima a los ya elegidos (solo entre nodos alcanzables)
+        dist, _ = _dijkstra_ids(compact, random.Random(seed).randrange(n))
+        nearest = array("d", [math.inf]) * n
+        candidate = max(range(n), key=lambda v: dist[v] if dist[v] < math.inf else -1.0)
+
+        landmarks: List[int] = []
+        dist_from: List[array] = []
+        dist_to: List[array] = []
+        for _ in range(k):
+            landmarks.append(candidate)
+            d_from, _ = _dijkstra_ids(compact, candidate)
+            d_to = d_from if compact.undirected else _dijkstra_ids(compact, candidate, reverse=True)[0]
+            dist_from.append(d_from)
+            dist_to.append(d_to)
+            best, candidate = -1.0, -1
+            for v in range(n):
+                d = d_from[v]
+                if d < nearest[v]:
+                    nearest[v] = d
+                if nearest[v] < math.inf and nearest[v] > best and v not in landmarks:
+                    best, candidate = nearest[v], v
+            if candidate < 0:
+                break
+        return cls(landmarks, dist_from, dist_to, n, compact.lambda_w, compact.version, _graph_fingerprint(compact))
+
+    def _check(self, graph: Union["CityGraph", "CompactGraph"]) -> Optional[Dict[str, int]]:
+        """Valida que las tablas correspondan al grafo; devuelve su índice nombre -> id (None si es compacto)."""
+        bound = self._bound
+        if bound is not None and bound[0] is graph and bound[1] == graph.version:
+            return bound[2]
+        n = len(graph) if isinstance(graph, CompactGraph) else len(graph.coords)
+        if n != self.num_nodes or graph.lambda_w != self.lambda_w:
+            raise ValueError("Las tablas de landmarks no corresponden a este grafo (nodos o λ_w distintos)")
+        if self.version is not None:
+            if graph.version != self.version:
+                raise ValueError(
+                    f"El grafo cambió después de construir los landmarks (versión {graph.version}, "
+                    f"tablas de la versión {self.version}); hay que reconstruirlos"
+                )
+        elif self.fingerprint is not None:
+            arcs, checksum = _graph_fingerprint(graph)
+            if arcs != self.fingerprint[0] or not math.isclose(checksum, self.fingerprint[1], rel_tol=1e-9):
+                raise ValueError("Las tablas de landmarks no corresponden a este grafo (aristas o costos distintos)")
+        index = None if isinstance(graph, CompactGraph) else _node_index(graph)
+        self._bound = (graph, graph.version, index)
+        return index
+
+    def bind(self, graph: Union["CityGraph", "CompactGraph"], target, reverse: bool = False) -> Callable[[object], float]:
+        index = self._check(graph)
+        euclid = EuclideanHeuristic().bind(graph, target, reverse)
+        t = target if index is None else index[target]
+        # (tabla_a, tabla_b, ca, cb): cota = max(ca - tabla_a[v], tabla_b[v] - cb); se omiten las inalcanzables
+        terms = []
+        for d_from, d_to in zip(self.dist_from, self.dist_to):
+            if reverse:
+                # estimar d(t, v): d(L, v) - d(L, t)  y  d(t, L) - d(v, L)
+                if d_from[t] < math.inf and d_to[t] < math.inf:
+                    terms.append((d_to, d_from, d_to[t], d_from[t]))
+            elif d_from[t] < math.inf and d_to[t] < math.inf:
+                terms.append((d_from, d_to, d_from[t], d_to[t]))
+
+        if index is None:
+            def h(v) -> float:
+                best = euclid(v)
+                for table_a, table_b, ca, cb in terms:
+                    lb = ca - table_a[v]
+                    if lb > best:
+                        best = lb
+                    lb = table_b[v] - cb
+                    if lb > best:
+                        best = lb
+                return best
+            return h
+
+        def h_named(v) -> float:
+            i = index[v]
+            best = euclid(v)
+            for table_a, table_b, ca, cb in terms:
+                lb = ca - table_a[i]
+                if lb > best:
+                    best = lb
+                lb = table_b[i] - cb
+                if lb > best:
+                    best = lb
+            return best
+        return h_named
+
+    def save(self, path: str) -> None:
+        """Guarda las tablas junto al grafo: una línea JSON de cabecera seguida de los float64 en binario."""
+        header = {
+            "format": "alt-landmarks/2",
+            "landmarks": self.landmarks,
+            "num_nodes": self.num_nodes,
+            "lambda_w": self.lambda_w,
+            "directed": any(a is not b for a, b in zip(self.dist_from, self.dist_to)),
+            "fingerprint": self.fingerprint,
+        }
+        with open(path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for table in self.dist_from:
+                table.tofile(f)
+            if header["directed"]:
+                for table in self.dist_to:
+                    table.tofile(f)
+
+    @classmethod
+    def load(cls, path: str, graph: Union["CityGraph", "CompactGraph", None] = None) -> "LandmarkHeuristic":
+        """
+        Carga tablas guardadas con save. La huella de la cabecera se compara contra el grafo al
+        enlazar (o aquí mismo si se pasa graph); los archivos alt-landmarks/1 no la tienen.
+        """
+        with open(path, "rb") as f:
+            header = json.loads(f.readline().decode("utf-8"))
+            if header.get("format") not in ("alt-landmarks/1", "alt-landmarks/2"):
+                raise ValueError(f"Formato de landmarks desconocido en {path}")
+            n, k = header["num_nodes"], len(header["landmarks"])
+
+            def read_tables() -> List[array]:
+                tables = []
+                for _ in range(k):
+                    table = array("d")
+                    table.fromfile(f, n)
+                    tables.append(table)
+                return tables
+
+            dist_from = read_tables()
+            dist_to = read_tables() if header["directed"] else dist_from
+        fingerprint = header.get("fingerprint")
+        heuristic = cls(header["landmarks"], dist_from, dist_to, n, header["lambda_w"],
+                        fingerprint=tuple(fingerprint) if fingerprint is not None else None)
+        if graph is not None:
+            heuristic._check(graph)
+        return heuristic
+
+
+def _node_index(graph: "CityGraph") -> Dict[str, int]:
+    # Orden de ids = orden de inserción de coords (el mismo que usa CityGraph.compile)
+    return {n: i for i, n in enumerate(graph.coords)}
+
+
+def _graph_fingerprint(graph: Union["CityGraph", "CompactGraph"]) -> Tuple[int, float]:
+    """Huella (arcos, suma exacta de costos) para detectar tablas de otro grafo o de aristas viejas."""
+    if isinstance(graph, CompactGraph):
+        return len(graph.targets), math.fsum(graph.costs)
+    rows = graph.costs.values()
+    return sum(len(row) for row in rows), math.fsum(c for row in rows for c in row.values())
+
+
+def _bind_heuristic(
+    heuristic: Union[Heuristic, Callable[[str, str], float], None],
+    graph: Union["CityGraph", "CompactGraph"],
+    target,
+    reverse: bool = False,
+) -> Callable[[object], float]:
+    if heuristic is None:
+        heuristic = EuclideanHeuristic()
+    if isinstance(heuristic, Heuristic):
+        return heuristic.bind(graph, target, reverse)
+    # Función simple h(nodo, meta) sobre nombres
+    if isinstance(graph, CompactGraph):
+        names, target_name = graph.names, graph.names[target]
+        if reverse:
+            return lambda v: heuristic(target_name, names[v])
+        return lambda v: heuristic(names[v], target_name)
+    if reverse:
+        return lambda v: heuristic(target, v)
+    return lambda v: heuristic(v, target)
+
+
+class SearchTracer:
+    """
+    Interfaz de trazas estructuradas de búsqueda (reemplaza los print de verbose).
+
+    Eventos: start, expand, relax (mejora de un vecino), skip (vecino sin mejora), meet
+    (encuentro en la búsqueda bidireccional), goal y fail. Los algoritmos solo invocan el
+    trazador si se pasa uno, así que sin trazas el bucle no paga nada por evento.
+    """
+
+    def start(self, algorithm: str, start: str, goal: str) -> None:
+        pass
+
+    def expand(self, node: str, g: Optional[float], h: Optional[float], f: Optional[float], side: int = 0) -> None:
+        pass
+
+    def relax(self, node: str, parent: str, g: Optional[float], h: Optional[float], f: Optional[float], side: int = 0) -> None:
+        pass
+
+    def skip(self, node: str, parent: str, g_tentative: float, g_best: float, best_parent: Optional[str]) -> None:
+        pass
+
+    def meet(self, node: str, cost: float) -> None:
+        pass
+
+    def goal(self, node: str, cost: float) -> None:
+        pass
+
+    def fail(self) -> None:
+        pass
+
+
+class PrintTracer(SearchTracer):
+    """Imprime la exploración paso a paso con el mismo formato que verbose=True."""
+
+    _ARROWS = ("->", "<-")
+
+    def __init__(self) -> None:
+        self.algorithm = "astar"
+        self.mu = math.inf
+
+    def start(self, algorithm: str, start: str, goal: str) -> None:
+        self.algorithm = algorithm
+        self.mu = 0.0 if start == goal else math.inf
+        titles = {
+            "astar": "A*",
+            "bfs": "BFS",
+            "bidirectional": "A* bidireccional",
+            "multi_goal": "A* multi-meta",
+            "anytime": "A* anytime",
+            "time_dependent": "A* dependiente del tiempo",
+            "jps": "JPS",
+            "ida": "IDA*",
+        }
+        title = titles.get(algorithm, algorithm)
+        print(f"Inicio {title}: start={start}, goal={goal}")
+
+    def expand(self, node: str, g: Optional[float], h: Optional[float], f: Optional[float], side: int = 0) -> None:
+        if self.algorithm == "bfs":
+            print(f"Expandir (BFS): {node}")
+        elif self.algorithm == "bidirectional":
+            print(f"Expandir ({self._ARROWS[side]}): {node} | g={g:.3f}, μ={self.mu:.3f}")
+        else:
+            print(f"Expandir: {node} | g={g:.3f}, h={h:.3f}, f={f:.3f}")
+
+    def relax(self, node: str, parent: str, g: Optional[float], h: Optional[float], f: Optional[float], side: int = 0) -> None:
+        if self.algorithm == "bfs":
+            print(f"  Descubrir (BFS) {node} (padre={parent})")
+        elif self.algorithm != "bidirectional":
+            print(f"  Actualizar vecino {node}: g={g:.3f}, h={h:.3f}, f={f:.3f} (padre={parent})")
+
+    def skip(self, node: str, parent: str, g_tentative: float, g_best: float, best_parent: Optional[str]) -> None:
+        # Se muestra cuando NO se mejora el mejor costo conocido
+        shown = best_parent if best_parent is not None else "-"
+        print(f"  Omitir vecino {node}: g_tent={g_tentative:.3f} >= g_mejor={g_best:.3f} (padre actual de {node} = {shown})")
+
+    def meet(self, node: str, cost: float) -> None:
+        self.mu = cost
+        print(f"  Encuentro en {node}: μ={cost:.3f}")
+
+    def fail(self) -> None:
+        print("BFS: No se encontró camino." if self.algorithm == "bfs" else "No se encontró camino.")
+
+
+class TraceEvent(NamedTuple):
+    kind: str
+    node: Optional[str]
+    parent: Optional[str] = None
+    g: Optional[float] = None
+    h: Optional[float] = None
+    f: Optional[float] = None
+    side: int = 0
+
+
+class RingBufferTracer(SearchTracer):
+    """Guarda los últimos `capacity` eventos (TraceEvent) para analizarlos después de la búsqueda."""
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self.events: "deque[TraceEvent]" = deque(maxlen=capacity)
+        self.counts: Dict[str, int] = {}
+
+    def _add(self, event: TraceEvent) -> None:
+        self.events.append(event)
+        self.counts[event.kind] = self.counts.get(event.kind, 0) + 1
+
+    def start(self, algorithm: str, start: str, goal: str) -> None:
+        self._add(TraceEvent("start", start, parent=goal))
+
+    def expand(self, node: str, g: Optional[float], h: Optional[float], f: Optional[float], side: int = 0) -> None:
+        self._add(TraceEvent("expand", node, None, g, h, f, side))
+
+    def relax(self, node: str, parent: str, g: Optional[float], h: Optional[float], f: Optional[float], side: int = 0) -> None:
+        self._add(TraceEvent("relax", node, parent, g, h, f, side))
+
+    def skip(self, node: str, parent: str, g_tentative: float, g_best: float, best_parent: Optional[str]) -> None:
+        self._add(TraceEvent("skip", node, parent, g_tentative))
+
+    def meet(self, node: str, cost: float) -> None:
+        self._add(TraceEvent("meet", node, g=cost))
+
+    def goal(self, node: str, cost: float) -> None:
+        self._add(TraceEvent("goal", node, g=cost))
+
+    def fail(self) -> None:
+        self._add(TraceEvent("fail", None))
+
+    def to_dicts(self) -> List[Dict[str, object]]:
+        return [event._asdict() for event in self.events]
+
+
 def astar(
-    graph: CityGraph,
+    graph: Union[CityGraph, CompactGraph],
     start: str,
     goal: str,
     verbose: bool = False,
+    heuristic: Union[Heuristic, Callable[[str, str], float], None] = None,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
 ) -> SearchResult:
+    """
+    A* con heurística intercambiable: por defecto la euclidiana de CityGraph.h; se puede pasar
+    un Heuristic (p. ej. LandmarkHeuristic) o una función h(nodo, meta).
+    verbose=True equivale a tracer=PrintTracer(); record_order=False no guarda expanded_order.
+    """
+    if tracer is None and verbose:
+        tracer = PrintTracer()
+    if isinstance(graph, CompactGraph):
+        return _astar_compact(graph, start, goal, heuristic, tracer, record_order)
     if start not in graph.coords or goal not in graph.coords:
         raise ValueError("El nodo inicial o meta no existe en el grafo")
 
     t0 = time.perf_counter()
+    h = _bind_heuristic(heuristic, graph, goal)
+    heappush, heappop = heapq.heappush, heapq.heappop
+    costs = graph.costs
 
     counter = 0  # desempate estable en heap por si dos nodos tienen el mismo f y g
     open_heap: List[Tuple[float, float, int, str]] = []  # (f, g, tie, node)
     g: Dict[str, float] = {start: 0.0}
-    f0 = graph.h(start, goal)
-    heapq.heappush(open_heap, (f0, 0.0, counter, start))
+    g_get = g.get
+    f0 = h(start)
+    heappush(open_heap, (f0, 0.0, counter, start))
 
     came_from: Dict[str, str] = {}
     closed: set[str] = set()
     explored_count = 0
     expanded_order: List[str] = []
+    scanned = peak = 0
 
-    if verbose:
-        print(f"Inicio A*: start={start}, goal={goal}")
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("astar", start, goal)
 
     while open_heap:
-        f_cur, g_cur, _, u = heapq.heappop(open_heap)
+        f_cur, g_cur, _, u = heappop(open_heap)
         if u in closed:
             continue
         closed.add(u)
         explored_count += 1
-        expanded_order.append(u)
-
-        if verbose:
-            h_u = graph.h(u, goal)
-            print(f"Expandir: {u} | g={g_cur:.3f}, h={h_u:.3f}, f={f_cur:.3f}")
+        if record_order:
+            expanded_order.append(u)
+        if tracing:
+            tracer.expand(u, g_cur, h(u), f_cur)
 
         if u == goal:
             path = reconstruct_path(came_from, start, goal) if goal in came_from or start == goal else [start]
             t1 = time.perf_counter()
-            return SearchResult(path=path, cost=g_cur, explored=explored_count, runtime_sec=(t1 - t0), expanded_order=expanded_order)
+            if tracing:
+                tracer.goal(u, g_cur)
+            stats = _search_stats(counter + 1, len(open_heap), explored_count, counter, scanned, peak,
+                                  _HEAP_ENTRY_BYTES, (g, came_from, closed))
+            return SearchResult(path=path, cost=g_cur, explored=explored_count, runtime_sec=(t1 - t0),
+                                expanded_order=expanded_order, stats=stats)
 
-        for v in graph.neighbors(u):
+        row = costs[u]
+        scanned += len(row)
+        for v, c in row.items():
             if v in closed:
                 continue
-            tentative_g = g_cur + graph.cost(u, v)
-            if tentative_g < g.get(v, math.inf):
+            tentative_g = g_cur + c
+            if tentative_g < g_get(v, math.inf):
                 came_from[v] = u
                 g[v] = tentative_g
                 counter += 1
-                f_v = tentative_g + graph.h(v, goal)
-                heapq.heappush(open_heap, (f_v, tentative_g, counter, v))
-                if verbose:
-                    print(
-                        f"  Actualizar vecino {v}: g={tentative_g:.3f}, h={graph.h(v, goal):.3f}, f={f_v:.3f} (padre={u})"
-                    )
-            elif verbose:
-                # Mostrar cuando NO se mejora el mejor costo conocido (el if falla)
-                print(
-                    f"  Omitir vecino {v}: g_tent={tentative_g:.3f} >= g_mejor={g.get(v, math.inf):.3f} (padre actual de {v} = {came_from.get(v, '-')})"
-                )
+                h_v = h(v)
+                f_v = tentative_g + h_v
+                heappush(open_heap, (f_v, tentative_g, counter, v))
+                if tracing:
+                    tracer.relax(v, u, tentative_g, h_v, f_v)
+            elif tracing:
+                tracer.skip(v, u, tentative_g, g_get(v, math.inf), came_from.get(v))
+        if len(open_heap) > peak:
+            peak = len(open_heap)
 
     # Sin solución
     t1 = time.perf_counter()
-    if verbose:
-        print("No se encontró camino.")
-    return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0), expanded_order=expanded_order)
-
-
-def path_total_cost(graph: CityGraph, path: List[str]) -> float:
-    """Suma el costo real de un camino dado (usando cost del grafo)."""
-    if not path or len(path) == 1:
-        return 0.0
-    total = 0.0
-    for u, v in zip(path, path[1:]):
-        total += graph.cost(u, v)
-    return total
+    if tracing:
+        tracer.fail()
+    stats = _search_stats(counter + 1, 0, explored_count, counter, scanned, peak, _HEAP_ENTRY_BYTES, (g, came_from, closed))
+    return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                        expanded_order=expanded_order, stats=stats)
 
 
-def bfs(
-    graph: CityGraph,
+def _astar_compact(
+    graph: CompactGraph,
     start: str,
     goal: str,
-    verbose: bool = False,
+    heuristic: Union[Heuristic, Callable[[str, str], float], None] = None,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
 ) -> SearchResult:
-    """Búsqueda en anchura (no ponderada). Reporta el costo real del camino hallado."""
-    from collections import deque
-
-    if start not in graph.coords or goal not in graph.coords:
+    """A* sobre ids enteros y arreglos CSR; mismo orden de expansión que sobre CityGraph."""
+    if start not in graph or goal not in graph:
         raise ValueError("El nodo inicial o meta no existe en el grafo")
 
     t0 = time.perf_counter()
-    q = deque([start])
-    visited: set[str] = {start}
-    came_from: Dict[str, str] = {}
+    names = graph.names
+    offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+    s, t = graph.node_id(start), graph.node_id(goal)
+    h = _bind_heuristic(heuristic, graph, t)
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    counter = 0
+    open_heap: List[Tuple[float, float, int, int]] = []  # (f, g, tie, id)
+    g: Dict[int, float] = {s: 0.0}
+    g_get = g.get
+    heappush(open_heap, (h(s), 0.0, counter, s))
+
+    came_from: Dict[int, int] = {}
+    closed = bytearray(len(names))
     explored_count = 0
-    expanded_order: List[str] = []
+    expanded_ids: List[int] = []
+    scanned = peak = 0
 
-    if verbose:
-        print(f"Inicio BFS: start={start}, goal={goal}")
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("astar", start, goal)
 
-    while q:
-        u = q.popleft()
+    while open_heap:
+        f_cur, g_cur, _, u = heappop(open_heap)
+        if closed[u]:
+            continue
+        closed[u] = 1
         explored_count += 1
-        expanded_order.append(u)
-        if verbose:
-            print(f"Expandir (BFS): {u}")
+        if record_order:
+            expanded_ids.append(u)
+        if tracing:
+            tracer.expand(names[u], g_cur, h(u), f_cur)
 
-        if u == goal:
-            path = reconstruct_path(came_from, start, goal) if start != goal else [start]
+        if u == t:
+            path = [names[i] for i in reconstruct_path(came_from, s, t)]
             t1 = time.perf_counter()
-            return SearchResult(
-                path=path,
-                cost=path_total_cost(graph, path),
-                explored=explored_count,
-                runtime_sec=(t1 - t0),
-                expanded_order=expanded_order,
-            )
+            if tracing:
+                tracer.goal(names[u], g_cur)
+            stats = _search_stats(counter + 1, len(open_heap), explored_count, counter, scanned, peak,
+                                  _HEAP_ENTRY_BYTES, (g, came_from, closed))
+            return SearchResult(path=path, cost=g_cur, explored=explored_count, runtime_sec=(t1 - t0),
+                                expanded_order=[names[i] for i in expanded_ids], stats=stats)
 
-        for v in graph.neighbors(u):
-            if v in visited:
+        a, b = offsets[u], offsets[u + 1]
+        scanned += b - a
+        for k in range(a, b):
+            v = targets[k]
+            if closed[v]:
                 continue
-            visited.add(v)
-            came_from[v] = u
-            q.append(v)
-            if verbose:
-                print(f"  Descubrir (BFS) {v} (padre={u})")
+            tentative_g = g_cur + costs[k]
+            if tentative_g < g_get(v, math.inf):
+                came_from[v] = u
+                g[v] = tentative_g
+                counter += 1
+                h_v = h(v)
+                f_v = tentative_g + h_v
+                heappush(open_heap, (f_v, tentative_g, counter, v))
+                if tracing:
+                    tracer.relax(names[v], names[u], tentative_g, h_v, f_v)
+            elif tracing:
+                parent = names[came_from[v]] if v in came_from else None
+                tracer.skip(names[v], names[u], tentative_g, g_get(v, math.inf), parent)
+        if len(open_heap) > peak:
+            peak = len(open_heap)
 
     t1 = time.perf_counter()
-    if verbose:
-        print("BFS: No se encontró camino.")
-    return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0), expanded_order=expanded_order)
+    if tracing:
+        tracer.fail()
+    stats = _search_stats(counter + 1, 0, explored_count, counter, scanned, peak, _HEAP_ENTRY_BYTES, (g, came_from, closed))
+    return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                        expanded_order=[names[i] for i in expanded_ids], stats=stats)
 
 
-def demo(verbose: bool = True) -> None:
-    """Ejemplo con grafo grande (malla 5x4), viento y calles restringidas. Compara BFS y A*."""
-    # Construir una malla 5x4 (20 nodos): etiquetas tipo A0..E3
-    W, H = 5, 4
-    coords: Dict[str, Coord] = {}
-    for y in range(H):
-        for x in range(W):
-            name = f"{chr(65 + x)}{y}"
-            coords[name] = (float(x), float(y))
+class _GraphView:
+    """
+    Acceso uniforme a CityGraph (nodos = nombres) y CompactGraph (nodos = ids enteros)
+    para los algoritmos que se escriben una sola vez para ambas formas del grafo.
+    """
 
-    # λ_w pondera la penalización de viento
-    graph = CityGraph(coords, lambda_w=1.5, undirected=True)
+    __slots__ = ("graph", "out_edges", "in_edges", "name", "coord")
 
-    # Definir calles restringidas (no se agregan) y penalizaciones de viento en algunos tramos
-    restricted = {
-        frozenset({"B0", "B1"}),
-        frozenset({"C1", "C2"}),
-        frozenset({"D0", "D1"}),
-        frozenset({"A2", "A3"}),
-        frozenset({"E2", "E3"}),
-    }
-    wind_map: Dict[frozenset[str], float] = {
-        frozenset({"B0", "C0"}): 0.7,
-        frozenset({"C0", "D0"}): 1.0,
-        frozenset({"B1", "B2"}): 0.5,
-        frozenset({"C1", "D1"}): 1.2,
-        frozenset({"D1", "D2"}): 0.8,
-        frozenset({"A2", "B2"}): 0.3,
+    def __init__(self, graph: Union[CityGraph, "CompactGraph"]) -> None:
+        self.graph = graph
+        if isinstance(graph, CompactGraph):
+            self.out_edges = graph.out_edges
+            self.in_edges = graph.in_edges
+            self.name = graph.names.__getitem__
+            xs, ys = graph.xs, graph.ys
+            self.coord = lambda i: (xs[i], ys[i])
+        else:
+            costs, reverse_costs = graph.costs, graph.reverse_costs
+            self.out_edges = lambda u: costs[u].items()
+            self.in_edges = lambda v: reverse_costs[v].items()
+            self.name = lambda u: u
+            self.coord = graph.coords.__getitem__
+
+    def key(self, name: str):
+        if isinstance(self.graph, CompactGraph):
+            return self.graph.index[name]
+        return name
+
+    def contains(self, name: str) -> bool:
+        if isinstance(self.graph, CompactGraph):
+            return name in self.graph
+        return name in self.graph.coords
+
+
+def bidirectional_astar(
+    graph: Union[CityGraph, CompactGraph],
+    start: str,
+    goal: str,
+    verbose: bool = False,
+    heuristic: Union[Heuristic, Callable[[str, str], float], None] = None,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
+) -> SearchResult:
+    """
+    A* bidireccional con potenciales balanceados:
+        p_f(v) = (h(v, meta) - h(v, inicio)) / 2,   p_r(v) = -p_f(v)
+    Ambos potenciales son consistentes, así que cada lado es un Dijkstra sobre costos reducidos.
+    Se detiene cuando tope_f + tope_r >= μ (mejor costo inicio->meta visto), lo que garantiza
+    que μ es óptimo. Con λ_w = 0 y h = 0 equivale a Dijkstra bidireccional.
+
+    Un nodo ya cerrado por el lado opuesto no se encola ni se expande: su distancia a la otra
+    punta es exacta y el camino que pasa por él ya quedó registrado en μ al relajarlo.
+    El potencial de cada nodo se calcula una sola vez.
+
+    Con la heurística euclidiana la mitad de cada potencial se pierde al balancear, así que en
+    mallas reales expande aproximadamente lo mismo que astar (a veces más) y cada expansión
+    cuesta más; la ganancia clara es frente a Dijkstra (h = 0: ~30 % menos expansiones).
+    """
+    if tracer is None and verbose:
+        tracer = PrintTracer()
+    view = _GraphView(graph)
+    if not view.contains(start) or not view.contains(goal):
+        raise ValueError("El nodo inicial o meta no existe en el grafo")
+
+    t0 = time.perf_counter()
+    s, t = view.key(start), view.key(goal)
+    h_t = _bind_heuristic(heuristic, graph, t)
+    h_s = _bind_heuristic(heuristic, graph, s, reverse=True)
+
+    potentials: Dict[object, float] = {}
+    potentials_get = potentials.get
+
+    if heuristic is None or type(heuristic) is EuclideanHeuristic:
+        # Caso por defecto: ambas distancias euclidianas directo de las coordenadas
+        coord, hypot = view.coord, math.hypot
+        (sx, sy), (tx, ty) = coord(s), coord(t)
+
+        def p_f(v) -> float:
+            p = potentials_get(v)
+            if p is None:
+                x, y = coord(v)
+                p = potentials[v] = (hypot(x - tx, y - ty) - hypot(x - sx, y - sy)) / 2.0
+            return p
+    else:
+        def p_f(v) -> float:
+            p = potentials_get(v)
+            if p is None:
+                p = potentials[v] = (h_t(v) - h_s(v)) / 2.0
+            return p
+
+    counter = 0
+    # Índice 0: búsqueda hacia adelante desde start; índice 1: hacia atrás desde goal
+    heaps: List[List[Tuple[float, float, int, object]]] = [[(p_f(s), 0.0, 0, s)], [(-p_f(t), 0.0, 0, t)]]
+    g: List[Dict[object, float]] = [{s: 0.0}, {t: 0.0}]
+    came_from: List[Dict[object, object]] = [{}, {}]
+    closed: List[set] = [set(), set()]
+    edges = (view.out_edges, view.in_edges)
+    sign = (1.0, -1.0)
+    heappush, heappop = heapq.heappush, heapq.heappop
+    name = view.name
+
+    mu = 0.0 if s == t else math.inf
+    meet = s if s == t else None
+    explored_count = 0
+    expanded_order: List[str] = []
+    scanned = peak = 0
+
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("bidirectional", start, goal)
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= mu:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        other = 1 - side
+        f_cur, g_cur, _, u = heappop(heaps[side])
+        if u in closed[side]:
+            continue
+        closed[side].add(u)
+        if u in closed[other]:
+            continue
+        explored_count += 1
+        if record_order:
+            expanded_order.append(name(u))
+        if tracing:
+            tracer.expand(name(u), g_cur, f_cur - g_cur, f_cur, side)
+
+        g_side, g_other = g[side], g[other]
+        came_side, closed_side, closed_other = came_from[side], closed[side], closed[other]
+        heap_side, sgn = heaps[side], sign[side]
+        g_get = g_side.get
+        for v, c in edges[side](u):
+            scanned += 1
+            if v in closed_side:
+                continue
+            tentative_g = g_cur + c
+            if tentative_g < g_get(v, math.inf):
+                g_side[v] = tentative_g
+                came_side[v] = u
+                if v in g_other and tentative_g + g_other[v] < mu:
+                    mu = tentative_g + g_other[v]
+                    meet = v
+                    if tracing:
+                        tracer.meet(name(v), mu)
+                if v in closed_other:
+                    continue
+                counter += 1
+                f_v = tentative_g + sgn * p_f(v)
+                heappush(heap_side, (f_v, tentative_g, counter, v))
+                if tracing:
+                    tracer.relax(name(v), name(u), tentative_g, f_v - tentative_g, f_v, side)
+        if len(heaps[0]) + len(heaps[1]) > peak:
+            peak = len(heaps[0]) + len(heaps[1])
+
+    t1 = time.perf_counter()
+    stats = _search_stats(counter + 2, len(heaps[0]) + len(heaps[1]), explored_count, counter, scanned, peak,
+                          _HEAP_ENTRY_BYTES, (*g, *came_from, *closed), stored_nodes=len(g[0]) + len(g[1]))
+    if meet is None:
+        if tracing:
+            tracer.fail()
+        return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                            expanded_order=expanded_order, stats=stats)
+
+    forward = reconstruct_path(came_from[0], s, meet)
+    backward = reconstruct_path(came_from[1], t, meet)
+    backward.reverse()
+    path = [name(v) for v in forward + backward[1:]]
+    if tracing:
+        tracer.goal(name(meet), mu)
+    return SearchResult(path=path, cost=mu, explored=explored_count, runtime_sec=(t1 - t0),
+                        expanded_order=expanded_order, stats=stats)
+
+
+# Con pocas metas restantes, recorrerlas es más barato que consultar el índice espacial
+_MULTI_GOAL_LINEAR = 8
+
+
+def multi_goal_astar(
+    graph: Union[CityGraph, CompactGraph],
+    start: str,
+    goals: Iterable[str],
+    k: int = 1,
+    verbose: bool = False,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
+) -> List[SearchResult]:
+    """
+    A* hacia la más cercana (o las k más cercanas) de varias metas en una sola búsqueda.
+
+    h(v) = distancia euclidiana a la meta restante más cercana (índice espacial sobre las
+    metas): es el mínimo de heurísticas consistentes, así que también es consistente. Al
+    asentar una meta se retira del índice; h solo puede crecer, y las entradas del heap
+    calculadas con la h anterior se reevalúan al extraerlas. Devuelve una lista ordenada
+    por costo con un SearchResult por meta alcanzada (vacía si no se alcanza ninguna);
+    explored, runtime_sec y stats son los de la búsqueda compartida en ese momento.
+    """
+    if tracer is None and verbose:
+        tracer = PrintTracer()
+    if k < 1:
+        raise ValueError("k debe ser al menos 1")
+    view = _GraphView(graph)
+    goal_names = list(dict.fromkeys(goals))
+    if not goal_names:
+        raise ValueError("Se necesita al menos una meta")
+    if not view.contains(start) or not all(view.contains(n) for n in goal_names):
+        raise ValueError("El nodo inicial o alguna meta no existe en el grafo")
+
+    t0 = time.perf_counter()
+    coord, name = view.coord, view.name
+    s = view.key(start)
+    remaining: Dict[object, Coord] = {view.key(n): coord(view.key(n)) for n in goal_names}
+    k = min(k, len(remaining))
+    goal_index = SpatialIndex.build((key, x, y) for key, (x, y) in remaining.items())
+
+    def h(v) -> float:
+        x, y = coord(v)
+        if len(remaining) <= _MULTI_GOAL_LINEAR:
+            return min(math.hypot(x - gx, y - gy) for gx, gy in remaining.values())
+        return goal_index.nearest(x, y)[1]
+
+    heappush, heappop = heapq.heappush, heapq.heappop
+    counter = 0
+    epoch = 0  # cantidad de metas ya retiradas; las entradas de épocas anteriores tienen h vieja
+    open_heap: List[Tuple[float, float, int, int, object]] = [(h(s), 0.0, counter, epoch, s)]
+    g: Dict[object, float] = {s: 0.0}
+    g_get = g.get
+    came_from: Dict[object, object] = {}
+    closed: set = set()
+    explored_count = 0
+    expanded_order: List[str] = []
+    scanned = peak = rekeys = 0
+    results: List[SearchResult] = []
+
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("multi_goal", start, ", ".join(goal_names))
+
+    while open_heap:
+        f_cur, g_cur, _, entry_epoch, u = heappop(open_heap)
+        if u in closed:
+            continue
+        if entry_epoch != epoch:
+            f_new = g_cur + h(u)
+            if f_new > f_cur:
+                counter += 1
+                rekeys += 1
+                heappush(open_heap, (f_new, g_cur, counter, epoch, u))
+                continue
+        closed.add(u)
+        explored_count += 1
+        if record_order:
+            expanded_order.append(name(u))
+        if tracing:
+            tracer.expand(name(u), g_cur, f_cur - g_cur, f_cur)
+
+        if u in remaining:
+            path = [name(v) for v in reconstruct_path(came_from, s, u)]
+            if tracing:
+                tracer.goal(name(u), g_cur)
+            stats = _search_stats(counter + 1, len(open_heap), explored_count, counter - rekeys, scanned, peak,
+                                  _HEAP_ENTRY_BYTES, (g, came_from, closed))
+            results.append(SearchResult(path=path, cost=g_cur, explored=explored_count,
+                                        runtime_sec=time.perf_counter() - t0, expanded_order=list(expanded_order),
+                                        stats=stats))
+            if len(results) == k:
+                return results
+            x, y = remaining.pop(u)
+            goal_index.remove(u, x, y)
+            epoch += 1
+
+        for v, c in view.out_edges(u):
+            scanned += 1
+            if v in closed:
+                continue
+            tentative_g = g_cur + c
+            if tentative_g < g_get(v, math.inf):
+                came_from[v] = u
+                g[v] = tentative_g
+                counter += 1
+                h_v = h(v)
+                heappush(open_heap, (tentative_g + h_v, tentative_g, counter, epoch, v))
+                if tracing:
+                    tracer.relax(name(v), name(u), tentative_g, h_v, tentative_g + h_v)
+        if len(open_heap) > peak:
+            peak = len(open_heap)
+
+    if tracing and not results:
+        tracer.fail()
+    return results
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+def anytime_astar(
+    graph: Union[CityGraph, CompactGraph],
+    start: str,
+    goal: str,
+    epsilon: float = 2.5,
+    epsilon_step: float = 0.5,
+    time_budget: Optional[float] = None,
+    max_expansions: Optional[int] = None,
+    heuristic: Union[Heuristic, Callable[[str, str], float], None] = None,
+    verbose: bool = False,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
+) -> SearchResult:
+    """
+    A* anytime al estilo ARA* (Likhachev, Gordon y Thrun).
+
+    Primero busca con f = g + ε·h, que encuentra rápido un camino con costo <= ε · óptimo;
+    luego baja ε en epsilon_step y repara la búsqueda reutilizando g (los nodos inconsistentes
+    vuelven a la frontera) hasta llegar a ε = 1 o agotar el presupuesto. time_budget (segundos
+    de reloj) y max_expansions cortan la búsqueda y se devuelve el mejor camino ya completado.
+
+    SearchResult.suboptimality_bound es la cota alcanzada: costo <= cota · costo óptimo, con
+    cota = min(ε, g(meta) / min(g + h) sobre la frontera). Es 1.0 si se demostró optimalidad
+    e infinito si el presupuesto se agotó antes del primer camino.
+    """
+    if tracer is None and verbose:
+        tracer = PrintTracer()
+    if epsilon < 1.0:
+        raise ValueError("ε debe ser >= 1")
+    if epsilon_step <= 0:
+        raise ValueError("epsilon_step debe ser positivo")
+    view = _GraphView(graph)
+    if not view.contains(start) or not view.contains(goal):
+        raise ValueError("El nodo inicial o meta no existe en el grafo")
+
+    t0 = time.perf_counter()
+    deadline = t0 + time_budget if time_budget is not None else math.inf
+    expansion_limit = max_expansions if max_expansions is not None else math.inf
+    s, t = view.key(start), view.key(goal)
+    h = _bind_heuristic(heuristic, graph, t)
+    name, out_edges = view.name, view.out_edges
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    g: Dict[object, float] = {s: 0.0}
+    g_get = g.get
+    came_from: Dict[object, object] = {}
+    closed: set = set()
+    incons: set = set()
+    counter = 0
+    open_heap: List[Tuple[float, int, float, object]] = [(epsilon * h(s), counter, 0.0, s)]  # (clave, tie, g, nodo)
+    explored_count = 0
+    expanded_order: List[str] = []
+    scanned = relaxations = peak = 0
+
+    best_path: List[str] = []
+    best_cost = math.inf
+    bound = math.inf
+
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("anytime", start, goal)
+
+    def improve_path(eps: float) -> None:
+        # Expande mientras algún nodo de la frontera pueda mejorar g(meta) (con la clave ε-inflada)
+        nonlocal counter, explored_count, scanned, relaxations, peak
+        while open_heap:
+            key, _, g_entry, u = open_heap[0]
+            if u in closed or g_entry != g[u]:
+                heappop(open_heap)  # entrada vieja (nodo ya cerrado o con un g mejor después)
+                continue
+            if g_get(t, math.inf) <= key:
+                return
+            if explored_count >= expansion_limit or time.perf_counter() >= deadline:
+                raise _BudgetExhausted
+            heappop(open_heap)
+            closed.add(u)
+            explored_count += 1
+            g_u = g_entry
+            if record_order:
+                expanded_order.append(name(u))
+            if tracing:
+                tracer.expand(name(u), g_u, h(u), key)
+            for v, c in out_edges(u):
+                scanned += 1
+                tentative_g = g_u + c
+                if tentative_g < g_get(v, math.inf):
+                    g[v] = tentative_g
+                    came_from[v] = u
+                    relaxations += 1
+                    if v in closed:
+                        incons.add(v)  # se revisita en la próxima iteración con ε menor
+                    else:
+                        counter += 1
+                        h_v = h(v)
+                        heappush(open_heap, (tentative_g + eps * h_v, counter, tentative_g, v))
+                        if tracing:
+                            tracer.relax(name(v), name(u), tentative_g, h_v, tentative_g + eps * h_v)
+            if len(open_heap) > peak:
+                peak = len(open_heap)
+
+    eps = epsilon
+    try:
+        while True:
+            improve_path(eps)
+            g_goal = g_get(t, math.inf)
+            if g_goal == math.inf:
+                break  # la meta no es alcanzable
+            frontier = [v for _, _, _, v in open_heap if v not in closed]
+            frontier.extend(incons)
+            lower = min((g[v] + h(v) for v in frontier), default=g_goal)
+            best_path = [name(v) for v in reconstruct_path(came_from, s, t)]
+            # Los padres de nodos inconsistentes ya mejoraron: el camino puede costar menos que g(meta)
+            best_cost = min(g_goal, path_total_cost(graph, best_path))
+            bound = min(eps, g_goal / lower) if lower > 0 else 1.0
+            if tracing:
+                tracer.goal(name(t), g_goal)
+            if bound <= 1.0:
+                bound = 1.0
+                break
+            # Siguiente iteración: ε menor, nodos inconsistentes de vuelta a la frontera
+            eps = max(1.0, eps - epsilon_step)
+            incons.clear()
+            closed.clear()
+            open_heap[:] = []
+            for v in dict.fromkeys(frontier):
+                counter += 1
+                open_heap.append((g[v] + eps * h(v), counter, g[v], v))
+            heapq.heapify(open_heap)
+    except _BudgetExhausted:
+        pass
+
+    t1 = time.perf_counter()
+    if tracing and not best_path:
+        tracer.fail()
+    stats = _search_stats(counter + 1, len(open_heap), explored_count, relaxations, scanned, peak,
+                          _HEAP_ENTRY_BYTES, (g, came_from, closed, incons))
+    return SearchResult(path=best_path, cost=best_cost, explored=explored_count, runtime_sec=(t1 - t0),
+                        expanded_order=expanded_order, stats=stats, suboptimality_bound=bound)
+
+
+def _require_numpy(feature: str) -> None:
+    if np is None:
+        raise ImportError(f"{feature} requiere numpy (pip install numpy)")
+
+
+class WindField:
+    """
+    Viento dependiente del tiempo sobre las aristas de un CompactGraph.
+
+    winds[k, s] es la penalización de viento de la arista k (orden CSR de graph.compile())
+    durante el slot s, que cubre [start_time + s·slot_duration, start_time + (s+1)·slot_duration).
+    Antes del primer slot se usa el primero y después del último, el último. Los costos de un
+    slot (euclidiana + λ_w · viento) se calculan en una sola pasada vectorizada y se guardan.
+    Requiere numpy.
+    """
+
+    def __init__(
+        self,
+        graph: Union[CityGraph, CompactGraph],
+        winds,
+        slot_duration: float,
+        start_time: float = 0.0,
+    ) -> None:
+        _require_numpy("WindField")
+        compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+        winds = np.asarray(winds, dtype=np.float64)
+        if winds.ndim != 2 or winds.shape[0] != compact.num_edges or winds.shape[1] == 0:
+            raise ValueError(f"winds debe tener forma (aristas={compact.num_edges}, slots), no {winds.shape}")
+        if (winds < 0).any():
+            raise ValueError("La penalización de viento debe ser no negativa")
+        if not slot_duration > 0:
+            raise ValueError("La duración del slot debe ser positiva")
+        self.graph = compact
+        self.winds = winds
+        self.slot_duration = float(slot_duration)
+        self.start_time = float(start_time)
+        self._lambda_w = compact.lambda_w
+        self._lengths = self._edge_lengths(compact)
+        self._slot_costs: Dict[int, List[float]] = {}
+
+    @staticmethod
+    def _edge_lengths(graph: CompactGraph):
+        xs = np.frombuffer(graph.xs, dtype=np.float64)
+        ys = np.frombuffer(graph.ys, dtype=np.float64)
+        offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        targets = np.frombuffer(graph.targets, dtype=np.int32)
+        sources = np.repeat(np.arange(len(graph), dtype=np.int64), np.diff(offsets))
+        return np.hypot(xs[sources] - xs[targets], ys[sources] - ys[targets])
+
+    @classmethod
+    def from_raster(
+        cls,
+        graph: Union[CityGraph, CompactGraph],
+        raster,
+        origin: Coord,
+        cell_size: float,
+        slot_duration: float,
+        start_time: float = 0.0,
+    ) -> "WindField":
+        """
+        Muestrea un pronóstico en malla raster[slot, fila, columna] en el punto medio de cada
+        arista (celda que lo contiene; fuera del raster se usa el borde más cercano).
+        La fila crece con y y la columna con x a partir de origin.
+        """
+        _require_numpy("WindField.from_raster")
+        compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+        raster = np.asarray(raster, dtype=np.float64)
+        if raster.ndim != 3:
+            raise ValueError("raster debe tener forma (slots, filas, columnas)")
+        xs = np.frombuffer(compact.xs, dtype=np.float64)
+        ys = np.frombuffer(compact.ys, dtype=np.float64)
+        offsets = np.frombuffer(compact.offsets, dtype=np.int64)
+        targets = np.frombuffer(compact.targets, dtype=np.int32)
+        sources = np.repeat(np.arange(len(compact), dtype=np.int64), np.diff(offsets))
+        mid_x = (xs[sources] + xs[targets]) / 2.0
+        mid_y = (ys[sources] + ys[targets]) / 2.0
+        cols = np.clip(np.floor((mid_x - origin[0]) / cell_size).astype(np.int64), 0, raster.shape[2] - 1)
+        rows = np.clip(np.floor((mid_y - origin[1]) / cell_size).astype(np.int64), 0, raster.shape[1] - 1)
+        winds = raster[:, rows, cols].T  # (aristas, slots)
+        return cls(compact, winds, slot_duration, start_time)
+
+    @property
+    def num_slots(self) -> int:
+        return self.winds.shape[1]
+
+    def slot(self, t: float) -> int:
+        s = int((t - self.start_time) // self.slot_duration)
+        return min(max(s, 0), self.num_slots - 1)
+
+    def slot_costs(self, slot: int) -> List[float]:
+        """Costos de todas las aristas en el slot (una pasada vectorizada, luego en caché)."""
+        if self.graph.lambda_w != self._lambda_w:
+            self._lambda_w = self.graph.lambda_w
+            self._slot_costs.clear()
+        costs = self._slot_costs.get(slot)
+        if costs is None:
+            # tolist() deja floats de Python: indexarlos en el bucle de A* es mucho más barato que numpy
+            costs = (self._lengths + self._lambda_w * self.winds[:, slot]).tolist()
+            self._slot_costs[slot] = costs
+        return costs
+
+
+def time_dependent_astar(
+    field: WindField,
+    start: str,
+    goal: str,
+    depart_time: float = 0.0,
+    verbose: bool = False,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
+) -> SearchResult:
+    """
+    A* dependiente del tiempo: el costo de u->v usa el slot de viento vigente al llegar a u
+    (hora de salida + g(u), con el costo medido en las mismas unidades que slot_duration).
+    La heurística euclidiana sigue siendo admisible porque el viento nunca es negativo.
+    El resultado es óptimo si los slots cumplen FIFO (salir más tarde no hace llegar antes),
+    como es habitual en A* dependiente del tiempo sin esperas.
+    """
+    if tracer is None and verbose:
+        tracer = PrintTracer()
+    graph = field.graph
+    if start not in graph or goal not in graph:
+        raise ValueError("El nodo inicial o meta no existe en el grafo")
+
+    t0 = time.perf_counter()
+    names, offsets, targets = graph.names, graph.offsets, graph.targets
+    s, t = graph.node_id(start), graph.node_id(goal)
+    h = _bind_heuristic(None, graph, t)
+    heappush, heappop = heapq.heappush, heapq.heappop
+    slot_of, slot_costs = field.slot, field.slot_costs
+
+    counter = 0
+    open_heap: List[Tuple[float, float, int, int]] = [(h(s), 0.0, counter, s)]
+    g: Dict[int, float] = {s: 0.0}
+    g_get = g.get
+    came_from: Dict[int, int] = {}
+    closed = bytearray(len(names))
+    explored_count = 0
+    expanded_ids: List[int] = []
+    scanned = peak = 0
+
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("time_dependent", start, goal)
+
+    found = False
+    g_cur = math.inf
+    while open_heap:
+        f_cur, g_cur, _, u = heappop(open_heap)
+        if closed[u]:
+            continue
+        closed[u] = 1
+        explored_count += 1
+        if record_order:
+            expanded_ids.append(u)
+        if tracing:
+            tracer.expand(names[u], g_cur, h(u), f_cur)
+        if u == t:
+            found = True
+            break
+
+        costs = slot_costs(slot_of(depart_time + g_cur))
+        a, b = offsets[u], offsets[u + 1]
+        scanned += b - a
+        for k in range(a, b):
+            v = targets[k]
+            if closed[v]:
+                continue
+            tentative_g = g_cur + costs[k]
+            if tentative_g < g_get(v, math.inf):
+                came_from[v] = u
+                g[v] = tentative_g
+                counter += 1
+                h_v = h(v)
+                heappush(open_heap, (tentative_g + h_v, tentative_g, counter, v))
+                if tracing:
+                    tracer.relax(names[v], names[u], tentative_g, h_v, tentative_g + h_v)
+        if len(open_heap) > peak:
+            peak = len(open_heap)
+
+    t1 = time.perf_counter()
+    stats = _search_stats(counter + 1, len(open_heap), explored_count, counter, scanned, peak,
+                          _HEAP_ENTRY_BYTES, (g, came_from, closed))
+    expanded_order = [names[i] for i in expanded_ids]
+    if not found:
+        if tracing:
+            tracer.fail()
+        return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                            expanded_order=expanded_order, stats=stats)
+    if tracing:
+        tracer.goal(goal, g_cur)
+    path = [names[i] for i in reconstruct_path(came_from, s, t)]
+    return SearchResult(path=path, cost=g_cur, explored=explored_count, runtime_sec=(t1 - t0),
+                        expanded_order=expanded_order, stats=stats)
+
+
+class JumpPointSearch:
+    """
+    Jump Point Search sobre las zonas de malla uniforme de un CityGraph.
+
+    Se detecta una malla regular (espaciado = longitud más común de las aristas
+    horizontales/verticales). Un nodo es "regular" si sus aristas van exactamente a las celdas
+    vecinas (8-conexas) que existen y ninguna tiene viento; las celdas sin nodo hacen de
+    obstáculo como en el JPS clásico (Harabor y Grastien), con sus vecinos forzados. Un nodo es
+    "interior" si él y sus vecinos son regulares: ahí se expanden solo los vecinos naturales y
+    forzados y se salta en línea recta hasta la meta, un nodo con vecinos forzados, un nodo no
+    interior o (en diagonal) un punto desde el que un salto ortogonal encuentra algo. Los nodos
+    no interiores (viento, calles restringidas, atajos sueltos) se expanden como en A*, así que
+    el costo es el mismo que el de astar. La estructura se recalcula si cambia graph.version.
+    """
+
+    _DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+    def __init__(self, graph: CityGraph) -> None:
+        if not isinstance(graph, CityGraph):
+            raise ValueError("JumpPointSearch trabaja sobre un CityGraph")
+        self.graph = graph
+        self._version = -1
+        self._detect()
+
+    def _detect(self) -> None:
+        graph = self.graph
+        coords, adjacency = graph.coords, graph.adjacency
+        self._version = graph.version
+        self.spacing = 0.0
+        self.cell_of: Dict[str, Tuple[int, int]] = {}
+        self.node_at: Dict[Tuple[int, int], str] = {}
+        self.interior: set = set()
+        self._open_cells: set = set()  # interiores con las 8 celdas vecinas presentes (sin vecinos forzados)
+        if not coords:
+            return
+
+        lengths: Dict[float, int] = {}
+        for u, row in adjacency.items():
+            x1, y1 = coords[u]
+            for v in row:
+                x2, y2 = coords[v]
+                if (x1 == x2) != (y1 == y2):
+                    d = abs(x2 - x1) + abs(y2 - y1)
+                    lengths[d] = lengths.get(d, 0) + 1
+        if not lengths:
+            return
+        spacing = max(lengths, key=lengths.get)
+        x0, y0 = next(iter(coords.values()))
+        for n, (x, y) in coords.items():
+            i, j = (x - x0) / spacing, (y - y0) / spacing
+            ri, rj = round(i), round(j)
+            if abs(i - ri) < 1e-9 and abs(j - rj) < 1e-9 and (ri, rj) not in self.node_at:
+                self.cell_of[n] = (ri, rj)
+                self.node_at[(ri, rj)] = n
+        self.spacing = spacing
+
+        node_at = self.node_at
+        regular = set()
+        for n, (i, j) in self.cell_of.items():
+            row = adjacency[n]
+            present = 0
+            for dx, dy in self._DIRECTIONS:
+                v = node_at.get((i + dx, j + dy))
+                if v is None:
+                    continue
+                if row.get(v) != 0.0:
+                    break
+                present += 1
+            else:
+                if len(row) == present:
+                    regular.add(n)
+        for n in regular:
+            i, j = self.cell_of[n]
+            neighbors = [node_at.get((i + dx, j + dy)) for dx, dy in self._DIRECTIONS]
+            if all(v is None or v in regular for v in neighbors):
+                self.interior.add(n)
+                if None not in neighbors:
+                    self._open_cells.add(n)
+
+    def _forced(self, i: int, j: int, dx: int, dy: int) -> List[Tuple[int, int]]:
+        """Direcciones forzadas al llegar a (i, j) moviéndose en (dx, dy) (reglas del JPS clásico)."""
+        node_at = self.node_at
+        forced: List[Tuple[int, int]] = []
+        if dx and dy:
+            if (i - dx, j) not in node_at and (i - dx, j + dy) in node_at:
+                forced.append((-dx, dy))
+            if (i, j - dy) not in node_at and (i + dx, j - dy) in node_at:
+                forced.append((dx, -dy))
+        elif dx:
+            for side in (1, -1):
+                if (i, j + side) not in node_at and (i + dx, j + side) in node_at:
+                    forced.append((dx, side))
+        else:
+            for side in (1, -1):
+                if (i + side, j) not in node_at and (i + side, j + dy) in node_at:
+                    forced.append((side, dy))
+        return forced
+
+    def _jump(self, i: int, j: int, dx: int, dy: int, goal: str) -> Optional[Tuple[str, int]]:
+        """Salta desde la celda (i, j) (nodo interior) en la dirección (dx, dy); devuelve (nodo, pasos)."""
+        node_at, interior, open_cells = self.node_at, self.interior, self._open_cells
+        steps = 0
+        while True:
+            i += dx
+            j += dy
+            steps += 1
+            nxt = node_at.get((i, j))
+            if nxt is None:
+                return None
+            if nxt == goal or nxt not in interior:
+                return nxt, steps
+            if nxt not in open_cells and self._forced(i, j, dx, dy):
+                return nxt, steps
+            if dx and dy and (self._jump(i, j, dx, 0, goal) or self._jump(i, j, 0, dy, goal)):
+                return nxt, steps
+
+    def _successor_directions(self, i: int, j: int, direction: Optional[Tuple[int, int]]) -> Iterable[Tuple[int, int]]:
+        if direction is None:
+            return self._DIRECTIONS
+        dx, dy = direction
+        natural = [(dx, dy), (dx, 0), (0, dy)] if dx and dy else [direction]
+        return natural + self._forced(i, j, dx, dy)
+
+    def search(
+        self,
+        start: str,
+        goal: str,
+        verbose: bool = False,
+        tracer: Optional[SearchTracer] = None,
+        record_order: bool = True,
+    ) -> SearchResult:
+        if tracer is None and verbose:
+            tracer = PrintTracer()
+        graph = self.graph
+        if start not in graph.coords or goal not in graph.coords:
+            raise ValueError("El nodo inicial o meta no existe en el grafo")
+        if graph.version != self._version:
+            self._detect()
+
+        t0 = time.perf_counter()
+        h = _bind_heuristic(None, graph, goal)
+        heappush, heappop = heapq.heappush, heapq.heappop
+        costs, cell_of, interior = graph.costs, self.cell_of, self.interior
+        straight, diagonal = self.spacing, self.spacing * math.sqrt(2.0)
+
+        counter = 0
+        open_heap: List[Tuple[float, float, int, str]] = [(h(start), 0.0, counter, start)]
+        g: Dict[str, float] = {start: 0.0}
+        g_get = g.get
+        came_from: Dict[str, str] = {}
+        # Segmento que llega a cada punto de salto: (dx, dy, pasos) si fue un salto, None si fue una arista
+        segment: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        arrival: Dict[str, Optional[Tuple[int, int]]] = {start: None}
+        closed: set = set()
+        explored_count = 0
+        expanded_order: List[str] = []
+        scanned = peak = 0
+
+        tracing = tracer is not None
+        if tracing:
+            tracer.start("jps", start, goal)
+
+        def relax(v: str, u: str, tentative_g: float, seg: Optional[Tuple[int, int, int]],
+                  direction: Optional[Tuple[int, int]]) -> None:
+            nonlocal counter
+            if v in closed or tentative_g >= g_get(v, math.inf):
+                return
+            g[v] = tentative_g
+            came_from[v] = u
+            segment[v] = seg
+            arrival[v] = direction
+            counter += 1
+            h_v = h(v)
+            heappush(open_heap, (tentative_g + h_v, tentative_g, counter, v))
+            if tracing:
+                tracer.relax(v, u, tentative_g, h_v, tentative_g + h_v)
+
+        found = False
+        g_cur = math.inf
+        while open_heap:
+            f_cur, g_cur, _, u = heappop(open_heap)
+            if u in closed:
+                continue
+            closed.add(u)
+            explored_count += 1
+            if record_order:
+                expanded_order.append(u)
+            if tracing:
+                tracer.expand(u, g_cur, h(u), f_cur)
+            if u == goal:
+                found = True
+                break
+
+            if u in interior:
+                i, j = cell_of[u]
+                for dx, dy in self._successor_directions(i, j, arrival[u]):
+                    hit = self._jump(i, j, dx, dy, goal)
+                    scanned += 1
+                    if hit is not None:
+                        v, steps = hit
+                        unit = diagonal if dx and dy else straight
+                        relax(v, u, g_cur + steps * unit, (dx, dy, steps), (dx, dy))
+            else:
+                # Expansión normal; se recuerda la dirección de malla para podar al llegar a un interior
+                cu = cell_of.get(u)
+                row = costs[u]
+                scanned += len(row)
+                for v, c in row.items():
+                    cv = cell_of.get(v)
+                    direction = None
+                    if cu is not None and cv is not None:
+                        step = (cv[0] - cu[0], cv[1] - cu[1])
+                        if step in self._DIRECTIONS:
+                            direction = step
+                    relax(v, u, g_cur + c, None, direction)
+            if len(open_heap) > peak:
+                peak = len(open_heap)
+
+        t1 = time.perf_counter()
+        stats = _search_stats(counter + 1, len(open_heap), explored_count, counter, scanned, peak,
+                              _HEAP_ENTRY_BYTES, (g, came_from, segment, arrival, closed))
+        if not found:
+            if tracing:
+                tracer.fail()
+            return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                                expanded_order=expanded_order, stats=stats)
+        if tracing:
+            tracer.goal(goal, g_cur)
+        return SearchResult(path=self._unpack(came_from, segment, start, goal), cost=g_cur, explored=explored_count,
+                            runtime_sec=(t1 - t0), expanded_order=expanded_order, stats=stats)
+
+    def _unpack(self, came_from: Dict[str, str], segment: Dict[str, Optional[Tuple[int, int, int]]],
+                start: str, goal: str) -> List[str]:
+        """Camino completo: cada salto se reemplaza por los nodos intermedios de la recta."""
+        path = [goal]
+        cur = goal
+        while cur != start:
+            seg = segment[cur]
+            if seg is not None:
+                dx, dy, steps = seg
+                i, j = self.cell_of[cur]
+                for k in range(1, steps):
+                    path.append(self.node_at[(i - k * dx, j - k * dy)])
+            cur = came_from[cur]
+            path.append(cur)
+        path.reverse()
+        return path
+
+
+# Bytes aproximados por nivel de la pila de IDA*: ranura + tupla (nodo, g, iterador) + float + iterador
+_IDA_FRAME_BYTES = 8 + sys.getsizeof((0, 0.0, None)) + sys.getsizeof(1.0) + 64
+
+
+def ida_star(
+    graph: Union[CityGraph, CompactGraph],
+    start: str,
+    goal: str,
+    max_nodes: Optional[int] = 100_000,
+    threshold_growth: float = 0.05,
+    heuristic: Union[Heuristic, Callable[[str, str], float], None] = None,
+    verbose: bool = False,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = False,
+) -> SearchResult:
+    """
+    IDA* con tabla de transposición acotada: búsqueda óptima con memoria controlada.
+
+    Cada iteración es un DFS que poda f = g + h > umbral; solo guarda el camino actual y una
+    tabla (nodo -> mejor g en la iteración) de a lo sumo max_nodes entradas que evita repetir
+    subárboles (None = sin límite). Con la tabla llena se siguen podando los nodos ya guardados,
+    pero no se agregan nuevos: menos memoria a cambio de más tiempo, de forma predecible.
+
+    threshold_growth hace crecer el umbral al menos en ese factor por iteración (al estilo
+    IDA*-CR): con costos reales casi cada f es distinto y el IDA* clásico (threshold_growth=0)
+    repetiría una iteración por valor. La última iteración termina como ramificación y poda,
+    así que el costo sigue siendo óptimo.
+    record_order es False por defecto porque el orden de expansión crece sin límite.
+    """
+    if tracer is None and verbose:
+        tracer = PrintTracer()
+    if max_nodes is not None and max_nodes < 1:
+        raise ValueError("max_nodes debe ser al menos 1")
+    if threshold_growth < 0:
+        raise ValueError("threshold_growth no puede ser negativo")
+    view = _GraphView(graph)
+    if not view.contains(start) or not view.contains(goal):
+        raise ValueError("El nodo inicial o meta no existe en el grafo")
+
+    t0 = time.perf_counter()
+    s, t = view.key(start), view.key(goal)
+    h = _bind_heuristic(heuristic, graph, t)
+    name, out_edges = view.name, view.out_edges
+    capacity = max_nodes if max_nodes is not None else math.inf
+
+    threshold = h(s)
+    best_cost = 0.0 if s == t else math.inf
+    best_path: List[object] = [s] if s == t else []
+    explored_count = 0
+    expanded_order: List[str] = []
+    scanned = relaxations = peak_depth = peak_stored = peak_table_bytes = 0
+
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("ida", start, goal)
+
+    while best_cost == math.inf:
+        table: Dict[object, float] = {s: 0.0}
+        path: List[object] = [s]
+        on_path = {s}
+        stack = [(s, 0.0, iter(out_edges(s)))]
+        next_threshold = math.inf
+        explored_count += 1
+        if record_order:
+            expanded_order.append(name(s))
+        if tracing:
+            tracer.expand(name(s), 0.0, h(s), h(s))
+
+        while stack:
+            u, g_u, edges = stack[-1]
+            for v, c in edges:
+                scanned += 1
+                if v in on_path:
+                    continue
+                g_v = g_u + c
+                h_v = h(v)
+                f_v = g_v + h_v
+                if f_v > threshold:
+                    if f_v < next_threshold:
+                        next_threshold = f_v
+                    continue
+                if f_v >= best_cost:
+                    continue
+                known = table.get(v)
+                if known is not None and known <= g_v:
+                    continue
+                if known is not None or len(table) < capacity:
+                    table[v] = g_v
+                relaxations += 1
+                if tracing:
+                    tracer.relax(name(v), name(u), g_v, h_v, f_v)
+                if v == t:
+                    # Se sigue buscando en esta iteración por si hay un camino más barato (poda por best_cost)
+                    best_cost = g_v
+                    best_path = path + [v]
+                    continue
+                path.append(v)
+                on_path.add(v)
+                stack.append((v, g_v, iter(out_edges(v))))
+                explored_count += 1
+                if record_order:
+                    expanded_order.append(name(v))
+                if tracing:
+                    tracer.expand(name(v), g_v, h_v, f_v)
+                if len(stack) > peak_depth:
+                    peak_depth = len(stack)
+                if len(table) + len(stack) > peak_stored:
+                    peak_stored = len(table) + len(stack)
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
+
+        peak_table_bytes = max(peak_table_bytes, sys.getsizeof(table) + len(table) * sys.getsizeof(1.0))
+        if best_cost < math.inf or next_threshold == math.inf:
+            break
+        # Todo camino con f <= umbral ya se exploró: el óptimo es > umbral
+        threshold = max(next_threshold, threshold * (1.0 + threshold_growth))
+
+    t1 = time.perf_counter()
+    stats = SearchStats(
+        pushes=explored_count,
+        pops=explored_count,
+        relaxations=relaxations,
+        failed_relaxations=scanned - relaxations,
+        peak_frontier=peak_depth,
+        peak_stored_nodes=max(peak_stored, 1),
+        peak_memory_bytes=peak_table_bytes + peak_depth * _IDA_FRAME_BYTES,
+    )
+    if best_cost == math.inf:
+        if tracing:
+            tracer.fail()
+        return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                            expanded_order=expanded_order, stats=stats)
+    if tracing:
+        tracer.goal(goal, best_cost)
+    return SearchResult(path=[name(v) for v in best_path], cost=best_cost, explored=explored_count,
+                        runtime_sec=(t1 - t0), expanded_order=expanded_order, stats=stats)
+
+
+class ContractionHierarchy:
+    """
+    Jerarquía de contracción para consultas repetidas sobre un grafo estático.
+
+    Preprocesamiento (build): se contraen los nodos de menor a mayor importancia. La
+    importancia combina diferencia de aristas, aristas originales que representan los atajos,
+    vecinos ya contraídos y nivel; tras cada contracción se actualiza la de los vecinos. Al
+    contraer v, para cada par u->v->w sin camino testigo más corto que evite v se agrega un
+    atajo u->w. Solo se guardan las aristas "hacia arriba" (hacia nodos de mayor rango); cada
+    atajo recuerda las dos aristas que reemplaza.
+
+    Consulta (query): Dijkstra bidireccional que solo sube en la jerarquía; el mejor punto
+    de encuentro da el costo óptimo y los atajos se desempaquetan al camino real sumando los
+    costos de las aristas originales. El estado de búsqueda son arreglos por id reutilizados
+    entre consultas (marcados con el número de consulta), así que una instancia no debe
+    consultarse desde varios hilos a la vez.
+    """
+
+    def __init__(
+        self,
+        graph: CompactGraph,
+        rank: array,
+        up_out: Tuple[array, array, array],
+        up_in: Tuple[array, array, array],
+        middle: Dict[int, int],
+    ) -> None:
+        self.graph = graph
+        self.rank = rank
+        self.up_out = up_out  # CSR (offsets, targets, costs) de aristas u->w con rank[w] > rank[u]
+        self.up_in = up_in  # CSR de aristas u->w con rank[u] > rank[w], indexado por w
+        self.lambda_w = graph.lambda_w
+        n = len(rank)
+        out_offsets, out_targets, out_costs = up_out
+        in_offsets, in_sources, in_costs = up_in
+        # Ids globales de arista: primero las de up_out y luego las de up_in, desplazadas en base
+        base = len(out_targets)
+        self._tails = array("i")
+        for u in range(n):
+            self._tails.extend([u] * (out_offsets[u + 1] - out_offsets[u]))
+        self._tails.extend(in_sources)
+        self._heads = array("i", out_targets)
+        for w in range(n):
+            self._heads.extend([w] * (in_offsets[w + 1] - in_offsets[w]))
+        self._edge_costs = out_costs + in_costs
+        # Un atajo u->w vía m (clave u * n + w en middle) reemplaza u->m, que baja y está en la
+        # fila m de up_in, y m->w, que sube y está en la fila m de up_out; -1 en aristas reales
+        first = array("i", [-1]) * len(self._heads)
+        second = array("i", [-1]) * len(self._heads)
+        for e in range(len(first)):
+            u, w = self._tails[e], self._heads[e]
+            m = middle.get(u * n + w)
+            if m is None:
+                continue
+            a = in_offsets[m]
+            first[e] = base + a + operator.indexOf(in_sources[a:in_offsets[m + 1]], u)
+            a = out_offsets[m]
+            second[e] = a + operator.indexOf(out_targets[a:out_offsets[m + 1]], w)
+        self.children = (first, second)
+        # Estado de consulta por lado: distancia, arista padre, consulta en la que el nodo se
+        # alcanzó y consulta en la que se asentó; las marcas evitan reinicializar entre consultas
+        self._dist = ([math.inf] * n, [math.inf] * n)
+        self._parent = ([-1] * n, [-1] * n)
+        self._reached = ([0] * n, [0] * n)
+        self._settled = ([0] * n, [0] * n)
+        self._stamp = 0
+
+    @property
+    def num_shortcuts(self) -> int:
+        return sum(1 for e in self.children[0] if e >= 0)
+
+    @classmethod
+    def build(
+        cls,
+        graph: Union[CityGraph, CompactGraph],
+        witness_settle_limit: int = 64,
+        verbose: bool = False,
+    ) -> "ContractionHierarchy":
+        compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+        n = len(compact)
+        out: List[Dict[int, float]] = [{} for _ in range(n)]
+        inn: List[Dict[int, float]] = [{} for _ in range(n)]
+        for u in range(n):
+            for v, c in compact.out_edges(u):
+                if u != v and c < out[u].get(v, math.inf):
+                    out[u][v] = c
+                    inn[v][u] = c
+
+        middle: Dict[int, int] = {}  # clave u * n + w -> nodo intermedio del atajo u->w
+        hops: Dict[int, int] = {}  # clave u * n + w -> aristas originales del atajo (1 si falta)
+        contracted = bytearray(n)
+        deleted_neighbors = [0] * n
+        level = [0] * n
+        rank = array("i", bytes(4 * n))
+        up_out_rows: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        up_in_rows: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        # Cota inferior de cualquier arista (los atajos solo suman): un nodo a distancia d no
+        # puede llevar a un destino de costo ≤ limit si d + min_cost > limit
+        min_cost = min(compact.costs, default=0.0)
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        def shortcuts(v: int) -> List[Tuple[int, int, float]]:
+            needed: List[Tuple[int, int, float]] = []
+            outs = out[v]
+            if not outs:
+                return needed
+            for u, c_uv in inn[v].items():
+                # Una arista directa u->w suficientemente barata ya es testigo
+                out_u = out[u]
+                pending = {w: c_uv + c for w, c in outs.items()
+                           if w != u and out_u.get(w, math.inf) > c_uv + c}
+                if not pending:
+                    continue
+                # Dijkstra acotado desde u en el grafo restante evitando v; un destino queda
+                # descartado apenas una distancia tentativa no supera el costo vía v
+                limit = max(pending.values())
+                dist = {u: 0.0}
+                heap = [(0.0, u)]
+                settled = 0
+                while heap and settled < witness_settle_limit:
+                    d_x, x = heappop(heap)
+                    if d_x > dist[x]:
+                        continue
+                    settled += 1
+                    for y, c in out[x].items():
+                        nd = d_x + c
+                        if nd <= limit and y != v and nd < dist.get(y, math.inf):
+                            dist[y] = nd
+                            if nd <= pending.get(y, -1.0):
+                                del pending[y]
+                                if not pending:
+                                    break
+                                limit = max(pending.values())
+                            if nd + min_cost <= limit:
+                                heappush(heap, (nd, y))
+                    if not pending:
+                        break
+                needed.extend((u, w, c) for w, c in pending.items())
+            return needed
+
+        def priority(v: int, needed: List[Tuple[int, int, float]]) -> int:
+            edge_difference = len(needed) - len(out[v]) - len(inn[v])
+            # Aristas originales que pasarían a representar los atajos menos las que desaparecen
+            hop_difference = (
+                sum(hops.get(u * n + v, 1) + hops.get(v * n + w, 1) for u, w, _ in needed)
+                - sum(hops.get(v * n + w, 1) for w in out[v])
+                - sum(hops.get(u * n + v, 1) for u in inn[v])
+            )
+            return edge_difference + hop_difference + deleted_neighbors[v] + 2 * level[v]
+
+        # Última simulación de cada nodo; al contraer un vecino se estima la nueva prioridad
+        # descartando sus atajos y se recalcula de verdad solo al salir de la cola
+        simulated = [shortcuts(v) for v in range(n)]
+        prio = [priority(v, simulated[v]) for v in range(n)]
+        heap = [(p, v) for v, p in enumerate(prio)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            p, v = heappop(heap)
+            if contracted[v] or p != prio[v]:
+                continue
+            needed = shortcuts(v)
+            prio[v] = priority(v, needed)
+            if heap and prio[v] > heap[0][0]:
+                simulated[v] = needed
+                heappush(heap, (prio[v], v))
+                continue
+
+            for u, w, c in needed:
+                if c < out[u].get(w, math.inf):
+                    out[u][w] = c
+                    inn[w][u] = c
+                    middle[u * n + w] = v
+                    hops[u * n + w] = hops.get(u * n + v, 1) + hops.get(v * n + w, 1)
+
+            up_out_rows[v] = list(out[v].items())
+            up_in_rows[v] = list(inn[v].items())
+            neighbors = set(out[v]).union(inn[v])
+            for w in out[v]:
+                del inn[w][v]
+            for u in inn[v]:
+                del out[u][v]
+            out[v], inn[v] = {}, {}
+            simulated[v] = []
+            contracted[v] = 1
+            rank[v] = order
+            order += 1
+            for x in neighbors:
+                deleted_neighbors[x] += 1
+                level[x] = max(level[x], level[v] + 1)
+                simulated[x] = [s for s in simulated[x] if s[0] != v and s[1] != v]
+                prio[x] = priority(x, simulated[x])
+                heappush(heap, (prio[x], x))
+            if verbose and order % 1000 == 0:
+                print(f"CH: {order}/{n} nodos contraídos, {len(middle)} atajos")
+
+        def to_csr(rows: List[List[Tuple[int, float]]]) -> Tuple[array, array, array]:
+            offsets, targets, costs = array("q", [0]), array("i"), array("d")
+            for row in rows:
+                for w, c in row:
+                    targets.append(w)
+                    costs.append(c)
+                offsets.append(len(targets))
+            return offsets, targets, costs
+
+        return cls(compact, rank, to_csr(up_out_rows), to_csr(up_in_rows), middle)
+
+    def _unpack(self, edges: List[int], ids: List[int], total: float) -> float:
+        """Expande las aristas (posibles atajos) a sus nodos reales en ids y suma sus costos a total."""
+        first, second = self.children
+        heads, costs = self._heads, self._edge_costs
+        stack = edges[::-1]
+        while stack:
+            e = stack.pop()
+            a = first[e]
+            if a < 0:
+                ids.append(heads[e])
+                total += costs[e]
+            else:
+                stack.append(second[e])
+                stack.append(a)
+        return total
+
+    def query(self, start: str, goal: str, record_order: bool = True) -> SearchResult:
+        if start not in self.graph or goal not in self.graph:
+            raise ValueError("El nodo inicial o meta no existe en el grafo")
+        if self.graph.lambda_w != self.lambda_w:
+            raise ValueError("λ_w cambió después de construir la jerarquía; hay que reconstruirla")
+
+        t0 = time.perf_counter()
+        s, t = self.graph.node_id(start), self.graph.node_id(goal)
+        names = self.graph.names
+        csr = (self.up_out, self.up_in)
+        base = (0, len(self.up_out[1]))
+        self._stamp += 1
+        stamp = self._stamp
+        dist, parent, reached, settled = self._dist, self._parent, self._reached, self._settled
+        for side, root in ((0, s), (1, t)):
+            dist[side][root] = 0.0
+            parent[side][root] = -1
+            reached[side][root] = stamp
+        heaps: List[List[Tuple[float, int]]] = [[(0.0, s)], [(0.0, t)]]
+        mu, meet = (0.0, s) if s == t else (math.inf, -1)
+        expanded_order: List[str] = []
+        explored, relaxations, scanned, peak, stored = 0, 0, 0, 2, 2
+
+        side = 0
+        while heaps[0] or heaps[1]:
+            # Alternar lados; un lado se agota cuando su mínimo ya no puede mejorar μ
+            for candidate in (side, 1 - side):
+                if heaps[candidate] and heaps[candidate][0][0] < mu:
+                    side = candidate
+                    break
+            else:
+                break
+            d_u, u = heapq.heappop(heaps[side])
+            if settled[side][u] == stamp:
+                side = 1 - side
+                continue
+            settled[side][u] = stamp
+            explored += 1
+            if record_order:
+                expanded_order.append(names[u])
+            if reached[1 - side][u] == stamp and d_u + dist[1 - side][u] < mu:
+                mu, meet = d_u + dist[1 - side][u], u
+            # Stall-on-demand: si un nodo de mayor rango ya llega a u más barato, u no está en
+            # un camino ascendente óptimo y no hace falta relajar sus aristas
+            offsets, targets, costs = csr[1 - side]
+            dist_side, reached_side = dist[side], reached[side]
+            stalled = False
+            for k in range(offsets[u], offsets[u + 1]):
+                x = targets[k]
+                if reached_side[x] == stamp and dist_side[x] + costs[k] < d_u:
+                    stalled = True
+                    break
+            if stalled:
+                side = 1 - side
+                continue
+            offsets, targets, costs = csr[side]
+            parent_side, offset = parent[side], base[side]
+            a, b = offsets[u], offsets[u + 1]
+            scanned += b - a
+            for k in range(a, b):
+                v = targets[k]
+                nd = d_u + costs[k]
+                if reached_side[v] != stamp:
+                    reached_side[v] = stamp
+                    stored += 1
+                elif nd >= dist_side[v]:
+                    continue
+                dist_side[v] = nd
+                parent_side[v] = offset + k
+                heapq.heappush(heaps[side], (nd, v))
+                relaxations += 1
+            peak = max(peak, len(heaps[0]) + len(heaps[1]))
+            side = 1 - side
+
+        stats = _search_stats(relaxations + 2, len(heaps[0]) + len(heaps[1]), explored, relaxations, scanned,
+                              peak, _HEAP_ENTRY_BYTES, (*dist, *parent, *reached, *settled), stored_nodes=stored)
+        if meet < 0:
+            t1 = time.perf_counter()
+            return SearchResult(path=[], cost=math.inf, explored=explored, runtime_sec=(t1 - t0),
+                                expanded_order=expanded_order, stats=stats)
+
+        # Subida: padres hacia s (se invierte); bajada: cada arista de up_in lleva hacia t
+        heads = self._heads
+        up_edges: List[int] = []
+        v = meet
+        while v != s:
+            e = parent[0][v]
+            up_edges.append(e)
+            v = self._tails[e]
+        up_edges.reverse()
+        down_edges: List[int] = []
+        v = meet
+        while v != t:
+            e = parent[1][v]
+            down_edges.append(e)
+            v = heads[e]
+        ids = [s]
+        cost = self._unpack(down_edges, ids, self._unpack(up_edges, ids, 0.0))
+        t1 = time.perf_counter()
+        return SearchResult(path=[names[i] for i in ids], cost=cost, explored=explored,
+                            runtime_sec=(t1 - t0), expanded_order=expanded_order, stats=stats)
+
+
+class IncrementalPlanner:
+    """
+    Replanificación incremental con D* Lite (Koenig y Likhachev).
+
+    La búsqueda va de la meta hacia el inicio y conserva g/rhs entre consultas: cuando cambia
+    el viento de algunas aristas solo se reparan los nodos afectados, y el resultado es el
+    mismo camino óptimo (y costo) que daría un A* desde cero. El inicio puede moverse
+    durante el vuelo con move_start (el término km mantiene válidas las claves de la cola).
+    """
+
+    def __init__(self, graph: CityGraph, start: str, goal: str) -> None:
+        if start not in graph.coords or goal not in graph.coords:
+            raise ValueError("El nodo inicial o meta no existe en el grafo")
+        self.graph = graph
+        self.start = start
+        self.goal = goal
+        self.km = 0.0
+        self.g: Dict[str, float] = {}
+        self.rhs: Dict[str, float] = {goal: 0.0}
+        self._open: Dict[str, Tuple[float, float]] = {}  # clave vigente de cada nodo en la cola
+        self._heap: List[Tuple[float, float, int, str]] = []
+        self._counter = 0
+        self._expanded: List[str] = []
+        self._stats = SearchStats()  # acumula desde el último plan(), incluidos los update_winds
+        self._push(goal)
+
+    def _key(self, s: str) -> Tuple[float, float]:
+        m = min(self.g.get(s, math.inf), self.rhs.get(s, math.inf))
+        return (m + self.graph.h(self.start, s) + self.km, m)
+
+    def _push(self, s: str) -> None:
+        key = self._key(s)
+        self._open[s] = key
+        self._counter += 1
+        self._stats.pushes += 1
+        heapq.heappush(self._heap, (key[0], key[1], self._counter, s))
+
+    def _top(self) -> Tuple[float, float]:
+        # Descarta entradas obsoletas (borrado perezoso)
+        heap = self._heap
+        while heap and self._open.get(heap[0][3]) != (heap[0][0], heap[0][1]):
+            heapq.heappop(heap)
+            self._stats.pops += 1
+            self._stats.stale_pops += 1
+        return (heap[0][0], heap[0][1]) if heap else (math.inf, math.inf)
+
+    @staticmethod
+    def _key_less(a: Tuple[float, float], b: Tuple[float, float]) -> bool:
+        # Con heurística exacta sobre el camino óptimo, k1 empata con el del inicio y el redondeo
+        # puede dejarlo apenas por encima; dentro de la tolerancia decide k2 (como en aritmética exacta)
+        tol = 1e-9 * max(1.0, abs(b[0])) if b[0] < math.inf else 0.0
+        if a[0] < b[0] - tol:
+            return True
+        if a[0] > b[0] + tol:
+            return False
+        return a[1] < b[1]
+
+    def _update_vertex(self, u: str) -> None:
+        if u != self.goal:
+            g = self.g
+            self.rhs[u] = min((c + g.get(v, math.inf) for v, c in self.graph.costs[u].items()), default=math.inf)
+        self._open.pop(u, None)
+        if self.g.get(u, math.inf) != self.rhs.get(u, math.inf):
+            self._stats.relaxations += 1
+            self._push(u)
+        else:
+            self._stats.failed_relaxations += 1
+
+    def _compute_shortest_path(self) -> None:
+        g, rhs, start, stats = self.g, self.rhs, self.start, self._stats
+        while self._key_less(self._top(), self._key(start)) or rhs.get(start, math.inf) != g.get(start, math.inf):
+            k_old = self._top()
+            if k_old == (math.inf, math.inf):
+                break
+            u = heapq.heappop(self._heap)[3]
+            stats.pops += 1
+            stats.peak_frontier = max(stats.peak_frontier, len(self._heap) + 1)
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+                continue
+            del self._open[u]
+            self._expanded.append(u)
+            if g.get(u, math.inf) > rhs.get(u, math.inf):
+                g[u] = rhs[u]
+                for p in self.graph.predecessors(u):
+                    self._update_vertex(p)
+            else:
+                g[u] = math.inf
+                self._update_vertex(u)
+                for p in self.graph.predecessors(u):
+                    self._update_vertex(p)
+
+    def plan(self) -> SearchResult:
+        """Repara la solución con los cambios pendientes y devuelve el camino óptimo actual."""
+        t0 = time.perf_counter()
+        self._expanded = []
+        self._compute_shortest_path()
+
+        path: List[str] = []
+        if self.g.get(self.start, math.inf) < math.inf:
+            path = [self.start]
+            cur = self.start
+            costs, g = self.graph.costs, self.g
+            while cur != self.goal:
+                cur = min(costs[cur], key=lambda v: costs[cur][v] + g.get(v, math.inf))
+                path.append(cur)
+        cost = path_total_cost(self.graph, path) if path else math.inf
+        t1 = time.perf_counter()
+        stats, self._stats = self._stats, SearchStats()
+        stats.peak_memory_bytes = stats.peak_frontier * _HEAP_ENTRY_BYTES + sum(
+            sys.getsizeof(c) for c in (self.g, self.rhs, self._open))
+        stats.peak_stored_nodes = max(len(self.g), len(self.rhs))
+        return SearchResult(path=path, cost=cost, explored=len(self._expanded), runtime_sec=(t1 - t0),
+                            expanded_order=self._expanded, stats=stats)
+
+    def update_winds(self, changes: Iterable[Tuple[str, str, float]]) -> None:
+        """Aplica un lote de (u, v, viento) al grafo y marca solo los nodos afectados para la próxima plan()."""
+        touched: set = set()
+        for u, v, wind in changes:
+            self.graph.add_edge(u, v, wind)
+            touched.add(u)
+            if self.graph.undirected:
+                touched.add(v)
+        for u in touched:
+            self._update_vertex(u)
+
+    def move_start(self, start: str) -> None:
+        """Mueve el inicio (posición actual del dron) sin invalidar la cola."""
+        if start not in self.graph.coords:
+            raise ValueError(f"Nodo inexistente en coords: {start}")
+        self.km += self.graph.h(self.start, start)
+        self.start = start
+
+
+def path_total_cost(graph: Union[CityGraph, CompactGraph], path: List[str]) -> float:
+    """Suma el costo real de un camino dado (usando cost del grafo)."""
+    if not path or len(path) == 1:
+        return 0.0
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        total += graph.cost(u, v)
+    return total
+
+
+def bfs(
+    graph: Union[CityGraph, CompactGraph],
+    start: str,
+    goal: str,
+    verbose: bool = False,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
+) -> SearchResult:
+    """Búsqueda en anchura (no ponderada). Reporta el costo real del camino hallado."""
+    if tracer is None and verbose:
+        tracer = PrintTracer()
+    if isinstance(graph, CompactGraph):
+        return _bfs_compact(graph, start, goal, tracer, record_order)
+    if start not in graph.coords or goal not in graph.coords:
+        raise ValueError("El nodo inicial o meta no existe en el grafo")
+
+    t0 = time.perf_counter()
+    q = deque([start])
+    visited: set[str] = {start}
+    came_from: Dict[str, str] = {}
+    explored_count = 0
+    expanded_order: List[str] = []
+    adjacency = graph.adjacency
+    scanned = peak = 0
+
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("bfs", start, goal)
+
+    while q:
+        u = q.popleft()
+        explored_count += 1
+        if record_order:
+            expanded_order.append(u)
+        if tracing:
+            tracer.expand(u, None, None, None)
+
+        if u == goal:
+            path = reconstruct_path(came_from, start, goal) if start != goal else [start]
+            t1 = time.perf_counter()
+            cost = path_total_cost(graph, path)
+            if tracing:
+                tracer.goal(u, cost)
+            return SearchResult(
+                path=path,
+                cost=cost,
+                explored=explored_count,
+                runtime_sec=(t1 - t0),
+                expanded_order=expanded_order,
+                suboptimality_bound=math.inf,
+                stats=_search_stats(len(visited), len(q), explored_count, len(visited) - 1, scanned, peak,
+                                    _QUEUE_ENTRY_BYTES, (q, visited, came_from)),
+            )
+
+        row = adjacency[u]
+        scanned += len(row)
+        for v in row:
+            if v in visited:
+                continue
+            visited.add(v)
+            came_from[v] = u
+            q.append(v)
+            if tracing:
+                tracer.relax(v, u, None, None, None)
+        if len(q) > peak:
+            peak = len(q)
+
+    t1 = time.perf_counter()
+    if tracing:
+        tracer.fail()
+    stats = _search_stats(len(visited), 0, explored_count, len(visited) - 1, scanned, peak,
+                          _QUEUE_ENTRY_BYTES, (q, visited, came_from))
+    return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                        expanded_order=expanded_order, stats=stats)
+
+
+def _bfs_compact(
+    graph: CompactGraph,
+    start: str,
+    goal: str,
+    tracer: Optional[SearchTracer] = None,
+    record_order: bool = True,
+) -> SearchResult:
+    """BFS sobre ids enteros; visitados en un bytearray en lugar de un set de strings."""
+    if start not in graph or goal not in graph:
+        raise ValueError("El nodo inicial o meta no existe en el grafo")
+
+    t0 = time.perf_counter()
+    names, offsets, targets = graph.names, graph.offsets, graph.targets
+    s, t = graph.node_id(start), graph.node_id(goal)
+    q = deque([s])
+    visited = bytearray(len(names))
+    visited[s] = 1
+    came_from: Dict[int, int] = {}
+    explored_count = 0
+    expanded_ids: List[int] = []
+    scanned = peak = 0
+
+    tracing = tracer is not None
+    if tracing:
+        tracer.start("bfs", start, goal)
+
+    while q:
+        u = q.popleft()
+        explored_count += 1
+        if record_order:
+            expanded_ids.append(u)
+        if tracing:
+            tracer.expand(names[u], None, None, None)
+
+        if u == t:
+            path = [names[i] for i in reconstruct_path(came_from, s, t)]
+            t1 = time.perf_counter()
+            cost = path_total_cost(graph, path)
+            if tracing:
+                tracer.goal(names[u], cost)
+            return SearchResult(
+                path=path,
+                cost=cost,
+                explored=explored_count,
+                runtime_sec=(t1 - t0),
+                expanded_order=[names[i] for i in expanded_ids],
+                suboptimality_bound=math.inf,
+                stats=_search_stats(len(came_from) + 1, len(q), explored_count, len(came_from), scanned, peak,
+                                    _QUEUE_ENTRY_BYTES, (q, visited, came_from)),
+            )
+
+        a, b = offsets[u], offsets[u + 1]
+        scanned += b - a
+        for k in range(a, b):
+            v = targets[k]
+            if visited[v]:
+                continue
+            visited[v] = 1
+            came_from[v] = u
+            q.append(v)
+            if tracing:
+                tracer.relax(names[v], names[u], None, None, None)
+        if len(q) > peak:
+            peak = len(q)
+
+    t1 = time.perf_counter()
+    if tracing:
+        tracer.fail()
+    stats = _search_stats(len(came_from) + 1, 0, explored_count, len(came_from), scanned, peak,
+                          _QUEUE_ENTRY_BYTES, (q, visited, came_from))
+    return SearchResult(path=[], cost=math.inf, explored=explored_count, runtime_sec=(t1 - t0),
+                        expanded_order=[names[i] for i in expanded_ids], stats=stats)
+
+
+@dataclass
+class HopDistances:
+    """
+    Resultado de frontier_bfs: saltos y padres por id de nodo del CompactGraph (arreglos numpy).
+    hops[i] = -1 y parents[i] = -1 para nodos no alcanzados; los orígenes tienen hops 0 y padre -1.
+    """
+    graph: CompactGraph
+    sources: List[str]
+    hops: object  # np.ndarray int32
+    parents: object  # np.ndarray int32
+    levels: int
+    runtime_sec: float
+
+    @property
+    def reached(self) -> int:
+        return int((self.hops >= 0).sum())
+
+    def hop(self, node: str) -> Optional[int]:
+        d = int(self.hops[self.graph.node_id(node)])
+        return d if d >= 0 else None
+
+    def reachable(self) -> List[str]:
+        names = self.graph.names
+        return [names[i] for i in np.flatnonzero(self.hops >= 0)]
+
+    def path(self, node: str) -> List[str]:
+        """Camino con menos saltos desde el origen más cercano (vacío si no se alcanzó)."""
+        i = self.graph.node_id(node)
+        if self.hops[i] < 0:
+            return []
+        names, parents = self.graph.names, self.parents
+        path = [names[i]]
+        while parents[i] >= 0:
+            i = int(parents[i])
+            path.append(names[i])
+        path.reverse()
+        return path
+
+
+def frontier_bfs(
+    graph: Union[CityGraph, CompactGraph],
+    sources: Union[str, Iterable[str]],
+    goal: Optional[str] = None,
+    max_hops: Optional[int] = None,
+) -> HopDistances:
+    """
+    BFS sincronizado por niveles sobre el CSR: cada nivel expande toda la frontera con numpy
+    (reunir vecinos, descartar visitados, quedarse con la primera aparición) en lugar de
+    nodo por nodo. Modos:
+      - un origen o varios (distancia en saltos al origen más cercano);
+      - con goal, se detiene en el nivel que alcanza la meta;
+      - sin goal, calcula todo lo alcanzable (opcionalmente hasta max_hops saltos).
+    Memoria: visitados en un arreglo de bytes más hops/padres int32 (9 bytes por nodo).
+    Con un CityGraph la forma compacta se compila una vez y se reutiliza hasta que el grafo
+    cambie de versión.
+    """
+    _require_numpy("frontier_bfs")
+    compact = graph if isinstance(graph, CompactGraph) else graph._compiled()
+    source_names = [sources] if isinstance(sources, str) else list(dict.fromkeys(sources))
+    if not source_names:
+        raise ValueError("Se necesita al menos un nodo de origen")
+    for name in source_names + ([goal] if goal is not None else []):
+        if name not in compact:
+            raise ValueError(f"Nodo inexistente en el grafo: {name}")
+
+    t0 = time.perf_counter()
+    n = len(compact)
+    offsets = np.frombuffer(compact.offsets, dtype=np.int64)
+    targets = np.frombuffer(compact.targets, dtype=np.int32)
+    visited = np.zeros(n, dtype=np.bool_)
+    hops = np.full(n, -1, dtype=np.int32)
+    parents = np.full(n, -1, dtype=np.int32)
+
+    frontier = np.unique(np.array([compact.node_id(s) for s in source_names], dtype=np.int64))
+    visited[frontier] = True
+    hops[frontier] = 0
+    goal_id = compact.node_id(goal) if goal is not None else -1
+    level = 0
+    while frontier.size and not (goal_id >= 0 and visited[goal_id]):
+        if max_hops is not None and level >= max_hops:
+            break
+        level += 1
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            break
+        # Posiciones CSR de todas las aristas salientes de la frontera, en orden
+        block_starts = np.cumsum(counts) - counts
+        positions = np.arange(total, dtype=np.int64) + np.repeat(starts - block_starts, counts)
+        neighbors = targets[positions]
+        from_nodes = np.repeat(frontier, counts)
+        fresh = ~visited[neighbors]
+        neighbors, from_nodes = neighbors[fresh], from_nodes[fresh]
+        frontier, first = np.unique(neighbors, return_index=True)
+        frontier = frontier.astype(np.int64)
+        visited[frontier] = True
+        hops[frontier] = level
+        parents[frontier] = from_nodes[first]
+
+    t1 = time.perf_counter()
+    return HopDistances(compact, source_names, hops, parents, int(hops.max()), t1 - t0)
+
+
+_SEARCHES: Dict[str, Callable[..., SearchResult]] = {"astar": astar, "bfs": bfs, "bidirectional": bidirectional_astar}
+
+
+def snap_to_node(graph: Union[CityGraph, CompactGraph], point: Coord, max_distance: Optional[float] = None) -> str:
+    """Nodo más cercano a una posición (x, y) cruda; ValueError si está a más de max_distance."""
+    node, d = graph.spatial_index().nearest(point[0], point[1])
+    if max_distance is not None and d > max_distance:
+        raise ValueError(f"No hay nodos a menos de {max_distance} de {point} (el más cercano, {node}, está a {d:.3f})")
+    return node
+
+
+def search_from_coords(
+    graph: Union[CityGraph, CompactGraph],
+    start: Coord,
+    goal: Coord,
+    algorithm: str = "astar",
+    max_snap_distance: Optional[float] = None,
+    **kwargs,
+) -> SearchResult:
+    """
+    Búsqueda entre posiciones (x, y) crudas: cada extremo se ajusta a su nodo más cercano con
+    el índice espacial y se ejecuta el algoritmo pedido ("astar", "bfs" o "bidirectional").
+    El costo reportado es el del camino en el grafo (sin los tramos de ajuste).
+    """
+    if algorithm not in _SEARCHES:
+        raise ValueError(f"Algoritmo desconocido: {algorithm} (opciones: {', '.join(_SEARCHES)})")
+    s = snap_to_node(graph, start, max_snap_distance)
+    t = snap_to_node(graph, goal, max_snap_distance)
+    return _SEARCHES[algorithm](graph, s, t, **kwargs)
+
+
+@dataclass
+class DistanceMatrix:
+    """Matriz densa de costos: costs[i][j] = costo óptimo sources[i] -> targets[j] (inf si no hay camino)."""
+    sources: List[str]
+    targets: List[str]
+    costs: List[List[float]]
+    paths: Optional[List[List[List[str]]]] = None
+    runtime_sec: float = 0.0
+
+
+# Estado de cada proceso del pool: se fija una vez por worker (heredado por fork, sin pickle por tarea)
+_MATRIX_WORKER: Optional[Tuple[CompactGraph, List[int], bool]] = None
+
+
+def _matrix_worker_init(graph: CompactGraph, target_ids: List[int], return_paths: bool) -> None:
+    global _MATRIX_WORKER
+    _MATRIX_WORKER = (graph, target_ids, return_paths)
+
+
+def _matrix_row(source: int) -> Tuple[List[float], Optional[List[List[int]]]]:
+    """Un árbol de Dijkstra por origen; se detiene cuando todas las metas pedidas están asentadas."""
+    graph, target_ids, return_paths = _MATRIX_WORKER
+    dist, parent = _dijkstra_ids(graph, source, targets=target_ids)
+    row = [dist[t] for t in target_ids]
+    if not return_paths:
+        return row, None
+    paths = [reconstruct_path(parent, source, t) if dist[t] < math.inf else [] for t in target_ids]
+    return row, paths
+
+
+def distance_matrix(
+    graph: Union[CityGraph, CompactGraph],
+    sources: Sequence[str],
+    targets: Sequence[str],
+    return_paths: bool = False,
+    processes: Optional[int] = None,
+) -> DistanceMatrix:
+    """
+    Costos óptimos de N orígenes a M destinos con N búsquedas (no N×M).
+    Con processes > 1 los orígenes se reparten en un pool de procesos; el grafo compacto se
+    entrega una sola vez a cada worker en su inicializador.
+    """
+    global _MATRIX_WORKER
+    compact = graph if isinstance(graph, CompactGraph) else graph.compile()
+    for name in list(sources) + list(targets):
+        if name not in compact:
+            raise ValueError(f"Nodo inexistente en el grafo: {name}")
+
+    t0 = time.perf_counter()
+    source_ids = [compact.node_id(n) for n in sources]
+    target_ids = [compact.node_id(n) for n in targets]
+
+    if processes is not None and processes > 1 and len(source_ids) > 1:
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        chunksize = max(1, len(source_ids) // (processes * 4))
+        with ctx.Pool(processes, initializer=_matrix_worker_init, initargs=(compact, target_ids, return_paths)) as pool:
+            rows = pool.map(_matrix_row, source_ids, chunksize=chunksize)
+    else:
+        previous = _MATRIX_WORKER
+        _matrix_worker_init(compact, target_ids, return_paths)
+        try:
+            rows = [_matrix_row(s) for s in source_ids]
+        finally:
+            _MATRIX_WORKER = previous
+
+    names = compact.names
+    costs = [row for row, _ in rows]
+    paths = None
+    if return_paths:
+        paths = [[[names[i] for i in p] for p in row_paths] for _, row_paths in rows]
+    t1 = time.perf_counter()
+    return DistanceMatrix(sources=list(sources), targets=list(targets), costs=costs, paths=paths, runtime_sec=(t1 - t0))
+
+
+class RouteCache:
+    """
+    Caché LRU de rutas delante de astar/bfs/bidirectional_astar.
+
+    La clave es (start, goal, algoritmo, λ_w, versión del grafo); como CityGraph.add_edge y los
+    cambios de λ_w incrementan la versión, una entrada vieja nunca puede devolverse (al detectar
+    una versión nueva la caché se vacía). Para los algoritmos óptimos se reutilizan también
+    subcaminos: todo sufijo de un camino óptimo es óptimo hasta la misma meta.
+    """
+
+    _ALGORITHMS: Dict[str, Callable[..., SearchResult]] = _SEARCHES
+    _OPTIMAL = ("astar", "bidirectional")
+
+    def __init__(self, graph: Union[CityGraph, CompactGraph], maxsize: int = 1024, reuse_subpaths: bool = True) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize debe ser positivo")
+        self.graph = graph
+        self.maxsize = maxsize
+        self.reuse_subpaths = reuse_subpaths
+        self._entries: "OrderedDict[tuple, SearchResult]" = OrderedDict()
+        self._suffix: Dict[Tuple[str, str, str], tuple] = {}  # (nodo, meta, algoritmo) -> clave del camino que lo contiene
+        self._version = graph.version
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _sync_version(self) -> None:
+        if self.graph.version != self._version:
+            self._entries.clear()
+            self._suffix.clear()
+            self._version = self.graph.version
+
+    def search(self, start: str, goal: str, algorithm: str = "astar") -> SearchResult:
+        if algorithm not in self._ALGORITHMS:
+            raise ValueError(f"Algoritmo desconocido: {algorithm} (opciones: {', '.join(self._ALGORITHMS)})")
+        t0 = time.perf_counter()
+        self._sync_version()
+        key = (start, goal, algorithm, self.graph.lambda_w, self._version)
+
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            t1 = time.perf_counter()
+            # Un acierto no expande nodos (stats vacías) pero conserva la cota de la búsqueda original
+            return SearchResult(path=list(cached.path), cost=cached.cost, explored=0, runtime_sec=(t1 - t0),
+                                expanded_order=[], suboptimality_bound=cached.suboptimality_bound)
+
+        if self.reuse_subpaths and algorithm in self._OPTIMAL:
+            owner = self._suffix.get((start, goal, algorithm))
+            full = self._entries.get(owner) if owner is not None else None
+            if full is not None:
+                self._entries.move_to_end(owner)
+                self.subpath_hits += 1
+                path = full.path[full.path.index(start):]
+                t1 = time.perf_counter()
+                return SearchResult(path=path, cost=path_total_cost(self.graph, path), explored=0,
+                                    runtime_sec=(t1 - t0), expanded_order=[],
+                                    suboptimality_bound=full.suboptimality_bound)
+
+        self.misses += 1
+        result = self._ALGORITHMS[algorithm](self.graph, start, goal)
+        # La entrada guarda su propia copia del camino: editar result no altera la caché
+        self._store(key, replace(result, path=list(result.path)))
+        return result
+
+    def astar(self, start: str, goal: str) -> SearchResult:
+        return self.search(start, goal, "astar")
+
+    def bfs(self, start: str, goal: str) -> SearchResult:
+        return self.search(start, goal, "bfs")
+
+    def _store(self, key: tuple, result: SearchResult) -> None:
+        self._entries[key] = result
+        start, goal, algorithm = key[0], key[1], key[2]
+        if self.reuse_subpaths and algorithm in self._OPTIMAL:
+            for node in result.path[1:-1]:
+                self._suffix[(node, goal, algorithm)] = key
+        while len(self._entries) > self.maxsize:
+            old_key, old = self._entries.popitem(last=False)
+            self.evictions += 1
+            for node in old.path[1:-1]:
+                if self._suffix.get((node, old_key[1], old_key[2])) == old_key:
+                    del self._suffix[(node, old_key[1], old_key[2])]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._suffix.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.subpath_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "subpath_hits": self.subpath_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.subpath_hits) / lookups if lookups else 0.0,
+        }
+
+
+def demo(verbose: bool = True) -> None:
+    """Ejemplo con grafo grande (malla 5x4), viento y calles restringidas. Compara BFS y A*."""
+    # Malla 5x4 (20 nodos) con etiquetas tipo A0..E3; λ_w pondera la penalización de viento
+    # Calles restringidas (no se agregan) y penalizaciones de viento en algunos tramos
+    restricted = {
+        frozenset({"B0", "B1"}),
+        frozenset({"C1", "C2"}),
+        frozenset({"D0", "D1"}),
+        frozenset({"A2", "A3"}),
+        frozenset({"E2", "E3"}),
+    }
+    wind_map: Dict[frozenset[str], float] = {
+        frozenset({"B0", "C0"}): 0.7,
+        frozenset({"C0", "D0"}): 1.0,
+        frozenset({"B1", "B2"}): 0.5,
+        frozenset({"C1", "D1"}): 1.2,
+        frozenset({"D1", "D2"}): 0.8,
+        frozenset({"A2", "B2"}): 0.3,
         frozenset({"C2", "C3"}): 1.5,
         frozenset({"D2", "E2"}): 0.9,
         frozenset({"E1", "E2"}): 0.6,
         frozenset({"B2", "C2"}): 0.4,
         frozenset({"B3", "C3"}): 1.1,
     }
-
-    def wind(u: str, v: str) -> float:
-        return wind_map.get(frozenset({u, v}), 0.0)
-
-    # Agregar calles ortogonales (sin bucles), omitiendo las restringidas
-    # Horizontales fila 0
-    graph.add_edge("A0", "B0", wind=wind("A0", "B0"))
-    graph.add_edge("B0", "C0", wind=wind("B0", "C0"))
-    graph.add_edge("C0", "D0", wind=wind("C0", "D0"))
-    graph.add_edge("D0", "E0", wind=wind("D0", "E0"))
-    # Horizontales fila 1
-    graph.add_edge("A1", "B1", wind=wind("A1", "B1"))
-    graph.add_edge("B1", "C1", wind=wind("B1", "C1"))
-    graph.add_edge("C1", "D1", wind=wind("C1", "D1"))
-    graph.add_edge("D1", "E1", wind=wind("D1", "E1"))
-    # Horizontales fila 2
-    graph.add_edge("A2", "B2", wind=wind("A2", "B2"))
-    graph.add_edge("B2", "C2", wind=wind("B2", "C2"))
-    graph.add_edge("C2", "D2", wind=wind("C2", "D2"))
-    graph.add_edge("D2", "E2", wind=wind("D2", "E2"))
-    # Horizontales fila 3
-    graph.add_edge("A3", "B3", wind=wind("A3", "B3"))
-    graph.add_edge("B3", "C3", wind=wind("B3", "C3"))
-    graph.add_edge("C3", "D3", wind=wind("C3", "D3"))
-    graph.add_edge("D3", "E3", wind=wind("D3", "E3"))
-
-    # Verticales columna A (A2-A3 restringida, se omite)
-    graph.add_edge("A0", "A1", wind=wind("A0", "A1"))
-    graph.add_edge("A1", "A2", wind=wind("A1", "A2"))
-    # Verticales columna B (B0-B1 restringida)
-    graph.add_edge("B1", "B2", wind=wind("B1", "B2"))
-    graph.add_edge("B2", "B3", wind=wind("B2", "B3"))
-    # Verticales columna C (C1-C2 restringida)
-    graph.add_edge("C0", "C1", wind=wind("C0", "C1"))
-    graph.add_edge("C2", "C3", wind=wind("C2", "C3"))
-    # Verticales columna D (D0-D1 restringida)
-    graph.add_edge("D1", "D2", wind=wind("D1", "D2"))
-    graph.add_edge("D2", "D3", wind=wind("D2", "D3"))
-    # Verticales columna E (E2-E3 restringida)
-    graph.add_edge("E0", "E1", wind=wind("E0", "E1"))
-    graph.add_edge("E1", "E2", wind=wind("E1", "E2"))
+    graph = build_grid(
+        5, 4,
+        lambda_w=1.5,
+        restricted=restricted,
+        wind=wind_map,
+        name=lambda x, y: f"{chr(65 + x)}{y}",
+    )
 
     # Agregar atajos diagonales (sin bucles)
-    graph.add_edge("A0", "B1", wind=0.9)
-    graph.add_edge("B1", "C2", wind=1.3)
-    graph.add_edge("C0", "D1", wind=1.6)
-    graph.add_edge("C2", "D3", wind=1.0)
-    graph.add_edge("A1", "B2", wind=0.6)
+    graph.add_edges([
+        ("A0", "B1", 0.9),
+        ("B1", "C2", 1.3),
+        ("C0", "D1", 1.6),
+        ("C2", "D3", 1.0),
+        ("A1", "B2", 0.6),
+    ])
 
     start, goal = "A0", "E3"
 
@@ -0,0 +1,303 @@
+"""
+Benchmarks del agente de búsqueda sobre mallas sintéticas grandes.
+
+Uso:
+    python benchmark_busqueda.py [lado_malla] [consultas]
+    python benchmark_busqueda.py --suite [--lados 10 32 100 316] [--consultas 50] [--salida bench.json]
+
+La suite compara todos los modos de búsqueda sobre el mismo conjunto fijo de consultas e
+imprime una tabla; con --salida guarda además los resultados (JSON o CSV según la extensión,
+"-" para JSON por la salida estándar) para compararlos entre commits.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from AgenteBusqueda import (
+    CityGraph,
+    CompactGraph,
+    ContractionHierarchy,
+    LandmarkHeuristic,
+    SearchResult,
+    astar,
+    bfs,
+    bidirectional_astar,
+    build_grid,
+    path_total_cost,
+)
+
+
+def malla_sintetica(ancho: int, alto: int, lambda_w: float = 1.5, seed: int = 0) -> CityGraph:
+    """Malla ortogonal con atajos diagonales, ~5% de calles restringidas y viento en ~30% de tramos."""
+    rng = random.Random(seed)
+    return build_grid(
+        ancho, alto,
+        lambda_w=lambda_w,
+        diagonals="main",
+        restricted=lambda u, v: rng.random() < 0.05,
+        wind=lambda u, v: round(rng.uniform(0.2, 1.5), 2) if rng.random() < 0.3 else 0.0,
+    )
+
+
+def consultas_aleatorias(graph: Union[CityGraph, CompactGraph], n: int, seed: int = 1) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    nodos = list(graph.coords) if isinstance(graph, CityGraph) else list(graph.names)
+    return [(rng.choice(nodos), rng.choice(nodos)) for _ in range(n)]
+
+
+def costo_sin_cache(graph: CityGraph, u: str, v: str) -> float:
+    """Costo recalculado como antes de la tabla de costos: hypot + lectura del mapa de viento."""
+    return graph.euclidean(u, v) + graph.lambda_w * graph.adjacency[u][v]
+
+
+def benchmark_tabla_costos(lado: int = 300, consultas: int = 20) -> None:
+    """Compara evaluar cada arista con hypot frente a leer la tabla de costos precalculada."""
+    t0 = time.perf_counter()
+    graph = malla_sintetica(lado, lado)
+    t1 = time.perf_counter()
+    n_aristas = sum(len(row) for row in graph.adjacency.values())
+    print(f"Malla {lado}x{lado}: {len(graph.coords)} nodos, {n_aristas} aristas dirigidas "
+          f"(construcción {t1 - t0:.2f} s)")
+
+    aristas = [(u, v) for u, row in graph.adjacency.items() for v in row]
+
+    t0 = time.perf_counter()
+    total_recalculado = sum(costo_sin_cache(graph, u, v) for u, v in aristas)
+    t1 = time.perf_counter()
+    total_cache = sum(graph.cost(u, v) for u, v in aristas)
+    t2 = time.perf_counter()
+    assert math.isclose(total_recalculado, total_cache)
+    print(f"Costo de todas las aristas: recalculado {(t1 - t0) * 1000:.1f} ms | tabla {(t2 - t1) * 1000:.1f} ms")
+
+    t0 = time.perf_counter()
+    graph.lambda_w = graph.lambda_w
+    t1 = time.perf_counter()
+    print(f"Reconstrucción completa de la tabla (cambio de λ_w): {(t1 - t0) * 1000:.1f} ms")
+
+    caminos = []
+    tiempo_astar = 0.0
+    for start, goal in consultas_aleatorias(graph, consultas):
+        res = astar(graph, start, goal)
+        tiempo_astar += res.runtime_sec
+        caminos.append(res.path)
+    print(f"A* ({consultas} consultas): {tiempo_astar * 1000 / consultas:.2f} ms promedio")
+
+    compact = graph.compile()
+    tiempo_compacto = sum(astar(compact, s, g).runtime_sec for s, g in consultas_aleatorias(graph, consultas))
+    print(f"A* sobre CompactGraph: {tiempo_compacto * 1000 / consultas:.2f} ms promedio")
+
+    t0 = time.perf_counter()
+    for path in caminos:
+        sum(costo_sin_cache(graph, u, v) for u, v in zip(path, path[1:]))
+    t1 = time.perf_counter()
+    for path in caminos:
+        path_total_cost(graph, path)
+    t2 = time.perf_counter()
+    print(f"Costo de caminos: recalculado {(t1 - t0) * 1000:.2f} ms | path_total_cost {(t2 - t1) * 1000:.2f} ms")
+
+
+def benchmark_landmarks(lado: int = 200, consultas: int = 20, k: int = 8) -> None:
+    """Compara nodos explorados por A* con la heurística euclidiana frente a ALT con k landmarks."""
+    graph = malla_sintetica(lado, lado)
+    t0 = time.perf_counter()
+    alt = LandmarkHeuristic.build(graph, k=k)
+    t1 = time.perf_counter()
+    print(f"Preprocesamiento ALT ({k} landmarks, malla {lado}x{lado}): {t1 - t0:.2f} s")
+
+    explorados_eu = explorados_alt = 0
+    tiempo_eu = tiempo_alt = 0.0
+    for start, goal in consultas_aleatorias(graph, consultas):
+        eu = astar(graph, start, goal)
+        lm = astar(graph, start, goal, heuristic=alt)
+        assert math.isclose(eu.cost, lm.cost) or eu.cost == lm.cost
+        explorados_eu += eu.explored
+        explorados_alt += lm.explored
+        tiempo_eu += eu.runtime_sec
+        tiempo_alt += lm.runtime_sec
+    print(f"Explorados promedio: euclidiana {explorados_eu / consultas:.0f} | ALT {explorados_alt / consultas:.0f}")
+    print(f"Tiempo promedio: euclidiana {tiempo_eu * 1000 / consultas:.2f} ms | ALT {tiempo_alt * 1000 / consultas:.2f} ms")
+
+
+MODOS = ("astar", "astar_alt", "bidireccional", "bfs", "ch")
+
+
+def _percentil(valores: Sequence[float], q: float) -> float:
+    """Percentil con interpolación lineal (q en [0, 100])."""
+    if not valores:
+        return math.nan
+    ordenados = sorted(valores)
+    pos = (len(ordenados) - 1) * q / 100.0
+    i = int(pos)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (pos - i)
+
+
+def _commit_actual() -> Optional[str]:
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def _preparar_modos(
+    graph: CompactGraph, modos: Sequence[str], k_landmarks: int, ch_max_nodos: int
+) -> Tuple[Dict[str, Callable[[str, str], SearchResult]], Dict[str, float]]:
+    """Construye la función de consulta de cada modo y mide su preprocesamiento (s)."""
+    funciones: Dict[str, Callable[[str, str], SearchResult]] = {}
+    preproceso: Dict[str, float] = {}
+    for modo in modos:
+        t0 = time.perf_counter()
+        if modo == "astar":
+            funciones[modo] = lambda s, t: astar(graph, s, t, record_order=False)
+        elif modo == "astar_alt":
+            alt = LandmarkHeuristic.build(graph, k=k_landmarks)
+            funciones[modo] = lambda s, t, alt=alt: astar(graph, s, t, heuristic=alt, record_order=False)
+        elif modo == "bidireccional":
+            funciones[modo] = lambda s, t: bidirectional_astar(graph, s, t, record_order=False)
+        elif modo == "bfs":
+            funciones[modo] = lambda s, t: bfs(graph, s, t, record_order=False)
+        elif modo == "ch":
+            if len(graph) > ch_max_nodos:
+                print(f"  ch omitido: {len(graph)} nodos > --ch-max-nodos {ch_max_nodos}")
+                continue
+            ch = ContractionHierarchy.build(graph)
+            funciones[modo] = lambda s, t, ch=ch: ch.query(s, t, record_order=False)
+        else:
+            raise ValueError(f"Modo de búsqueda desconocido: {modo}")
+        preproceso[modo] = time.perf_counter() - t0
+    return funciones, preproceso
+
+
+def benchmark_suite(
+    lados: Sequence[int] = (10, 32, 100, 316),
+    consultas: int = 50,
+    modos: Sequence[str] = MODOS,
+    seed: int = 0,
+    k_landmarks: int = 8,
+    ch_max_nodos: int = 10_000,
+) -> List[Dict[str, object]]:
+    """
+    Ejecuta cada modo sobre mallas de lado×lado nodos (10² a 10⁵ con los lados por defecto)
+    con las mismas consultas sembradas. El costo de referencia para la brecha de optimalidad
+    es el de A* euclidiano (óptimo); BFS muestra cuánto se pierde al ignorar los pesos.
+    """
+    filas: List[Dict[str, object]] = []
+    for lado in lados:
+        t0 = time.perf_counter()
+        graph = malla_sintetica(lado, lado, seed=seed).compile()
+        t1 = time.perf_counter()
+        print(f"Malla {lado}x{lado}: {len(graph)} nodos, {graph.num_edges} aristas (construcción {t1 - t0:.2f} s)")
+        pares = consultas_aleatorias(graph, consultas, seed=seed + 1)
+        funciones, preproceso = _preparar_modos(graph, modos, k_landmarks, ch_max_nodos)
+
+        referencia = [astar(graph, s, t, record_order=False).cost for s, t in pares]
+        for modo, buscar in funciones.items():
+            tiempos: List[float] = []
+            expansiones: List[int] = []
+            memorias: List[int] = []
+            brechas: List[float] = []
+            sin_camino = 0
+            for (s, t), optimo in zip(pares, referencia):
+                res = buscar(s, t)
+                tiempos.append(res.runtime_sec)
+                expansiones.append(res.explored)
+                memorias.append(res.stats.peak_memory_bytes)
+                if math.isinf(res.cost) or math.isinf(optimo):
+                    sin_camino += 1
+                elif optimo > 0:
+                    brechas.append(res.cost / optimo - 1.0)
+            fila: Dict[str, object] = {
+                "lado": lado,
+                "nodos": len(graph),
+                "aristas": graph.num_edges,
+                "modo": modo,
+                "consultas": len(pares),
+                "sin_camino": sin_camino,
+                "preproceso_s": preproceso[modo],
+                "p50_ms": _percentil(tiempos, 50) * 1000,
+                "p95_ms": _percentil(tiempos, 95) * 1000,
+                "expansiones_media": sum(expansiones) / len(expansiones) if expansiones else 0.0,
+                "expansiones_p95": _percentil(expansiones, 95),
+                "memoria_pico_media_bytes": sum(memorias) / len(memorias) if memorias else 0.0,
+                "memoria_pico_max_bytes": max(memorias, default=0),
+                "grafo_bytes": graph.nbytes,
+                "brecha_media": sum(brechas) / len(brechas) if brechas else 0.0,
+                "brecha_max": max(brechas, default=0.0),
+            }
+            filas.append(fila)
+            print(f"  {modo:<13} p50 {fila['p50_ms']:8.2f} ms | p95 {fila['p95_ms']:8.2f} ms | "
+                  f"expansiones {fila['expansiones_media']:9.0f} | memoria {fila['memoria_pico_media_bytes'] / 1024:9.0f} KiB | "
+                  f"brecha {fila['brecha_media'] * 100:6.2f} %")
+    return filas
+
+
+def guardar_resultados(filas: List[Dict[str, object]], ruta: str, parametros: Dict[str, object]) -> None:
+    """Guarda las filas en CSV (si la ruta termina en .csv) o en JSON con metadatos del entorno ("-" = stdout)."""
+    if ruta.endswith(".csv"):
+        with open(ruta, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(filas[0]) if filas else [])
+            writer.writeheader()
+            writer.writerows(filas)
+        return
+    documento = {
+        "commit": _commit_actual(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": parametros,
+        "resultados": filas,
+    }
+    if ruta == "-":
+        json.dump(documento, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(documento, f, indent=2, ensure_ascii=False)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks del agente de búsqueda")
+    parser.add_argument("lado", nargs="?", type=int, default=300, help="lado de la malla (benchmarks simples)")
+    parser.add_argument("consultas_simples", nargs="?", type=int, default=20, help="consultas (benchmarks simples)")
+    parser.add_argument("--suite", action="store_true", help="comparar todos los modos en varios tamaños")
+    parser.add_argument("--lados", type=int, nargs="+", default=[10, 32, 100, 316])
+    parser.add_argument("--consultas", type=int, default=50)
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--ch-max-nodos", type=int, default=10_000)
+    parser.add_argument("--salida", help="archivo .json o .csv, o - para JSON por stdout (por defecto solo la tabla)")
+    args = parser.parse_args(argv)
+
+    if not args.suite:
+        benchmark_tabla_costos(args.lado, args.consultas_simples)
+        benchmark_landmarks(args.lado, args.consultas_simples)
+        return
+
+    parametros = {
+        "lados": args.lados,
+        "consultas": args.consultas,
+        "modos": args.modos,
+        "seed": args.seed,
+        "landmarks": args.landmarks,
+        "ch_max_nodos": args.ch_max_nodos,
+    }
+    filas = benchmark_suite(args.lados, args.consultas, args.modos, args.seed, args.landmarks, args.ch_max_nodos)
+    if args.salida:
+        guardar_resultados(filas, args.salida, parametros)
+        if args.salida != "-":
+            print(f"Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
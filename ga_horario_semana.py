@@ -1,6 +1,13 @@
 # ga_horario_semana_mejorado.py
 # Versión mejorada con mejor distribución de sueño y gym
+import multiprocessing
+import os
 import random
+import sys
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
 import pandas as pd
 
 # -----------------------------
@@ -404,6 +411,231 @@ def aptitud_mejorada(horario, base, objetivo_bloques_estudio):
     return puntaje
 
 
+class CacheAptitud:
+    """Memoriza aptitud_mejorada por horario para un par (base, objetivo) fijo.
+
+    La clave es la tupla del horario (su hash es barato porque las etiquetas son
+    strings internados); al superar la capacidad se descarta la entrada usada
+    hace más tiempo (LRU). Los aciertos no llaman a aptitud_mejorada."""
+
+    def __init__(self, base, objetivo_bloques_estudio, capacidad=2048):
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la cache debe ser positiva")
+        self.base = base
+        self.objetivo_bloques_estudio = objetivo_bloques_estudio
+        self.capacidad = capacidad
+        self._puntajes = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.historial = []  # (aciertos, fallos) de cada generación cerrada
+        self._aciertos_gen = 0
+        self._fallos_gen = 0
+
+    def __len__(self):
+        return len(self._puntajes)
+
+    def _buscar(self, clave):
+        puntaje = self._puntajes.get(clave)
+        if puntaje is not None:
+            self._puntajes.move_to_end(clave)
+            self.aciertos += 1
+            self._aciertos_gen += 1
+        return puntaje
+
+    def _guardar(self, clave, puntaje):
+        self._puntajes[clave] = puntaje
+        if len(self._puntajes) > self.capacidad:
+            self._puntajes.popitem(last=False)
+        self.fallos += 1
+        self._fallos_gen += 1
+
+    def aptitud(self, horario):
+        clave = tuple(horario)
+        puntaje = self._buscar(clave)
+        if puntaje is None:
+            puntaje = aptitud_mejorada(horario, self.base, self.objetivo_bloques_estudio)
+            self._guardar(clave, puntaje)
+        return puntaje
+
+    def aptitudes(self, poblacion, evaluar_lote=None):
+        """Puntajes de toda una población; los fallos (sin repetidos) se evalúan
+        juntos con evaluar_lote(lista) o, por defecto, uno a uno"""
+        claves = [tuple(horario) for horario in poblacion]
+        resueltos, pendientes = {}, {}
+        for clave, horario in zip(claves, poblacion):
+            if clave in resueltos or clave in pendientes:
+                self.aciertos += 1
+                self._aciertos_gen += 1
+                continue
+            puntaje = self._buscar(clave)
+            if puntaje is None:
+                pendientes[clave] = horario
+            else:
+                resueltos[clave] = puntaje
+
+        if pendientes:
+            lote = list(pendientes.values())
+            if evaluar_lote is None:
+                nuevos = [aptitud_mejorada(h, self.base, self.objetivo_bloques_estudio) for h in lote]
+            else:
+                nuevos = evaluar_lote(lote)
+            for clave, puntaje in zip(pendientes, nuevos):
+                self._guardar(clave, puntaje)
+                resueltos[clave] = puntaje
+        return [resueltos[clave] for clave in claves]
+
+    def cerrar_generacion(self):
+        """Guarda los contadores de la generación actual y devuelve su tasa de aciertos"""
+        aciertos, fallos = self._aciertos_gen, self._fallos_gen
+        self.historial.append((aciertos, fallos))
+        self._aciertos_gen = self._fallos_gen = 0
+        return aciertos / (aciertos + fallos) if aciertos + fallos else 0.0
+
+    @property
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+
+class ResumenDia(NamedTuple):
+    """Términos parciales de aptitud_mejorada que dependen de un solo día"""
+    violacion: bool  # algún bloque fijo de la base fue alterado
+    puntaje_sueno: float
+    bloques_sueno: int
+    gym_apropiado: bool  # un único tramo de exactamente BLOQUES_GYM
+    puntaje_gym: float  # horario preferido + penalizaciones por tramos
+    bloques_gym: int
+    bloques_estudio: int
+    tramos_estudio: int
+    bloques_social: int
+
+
+def resumen_dia(horario, base, indice_dia):
+    """Calcula el ResumenDia de un día con las mismas reglas que aptitud_mejorada"""
+    horario_dia = obtener_horario_dia(horario, indice_dia)
+    base_dia = obtener_horario_dia(base, indice_dia)
+    violacion = any(b in ETIQUETAS_FIJAS and x != b for x, b in zip(horario_dia, base_dia))
+
+    bloques_sueno = longitudes_contiguas(horario_dia, "Sueño")
+    puntaje_sueno = 0
+    if bloques_sueno:
+        for longitud_bloque in bloques_sueno:
+            if BLOQUES_SUENO_MIN <= longitud_bloque <= BLOQUES_SUENO_MAX:
+                puntaje_sueno += 100
+            else:
+                puntaje_sueno -= 30 * abs(longitud_bloque - (BLOQUES_SUENO_MIN + BLOQUES_SUENO_MAX) / 2)
+
+        for indice_bloque, actividad in enumerate(horario_dia):
+            if actividad == "Sueño":
+                if indice_bloque >= a_bloque("22:00") or indice_bloque < a_bloque("08:00"):
+                    puntaje_sueno += 5
+                elif a_bloque("10:00") <= indice_bloque < a_bloque("18:00"):
+                    puntaje_sueno -= 15
+
+        if len(bloques_sueno) > 1:
+            puntaje_sueno -= 80 * (len(bloques_sueno) - 1)
+    else:
+        puntaje_sueno -= 200
+
+    bloques_gym = longitudes_contiguas(horario_dia, "Gym")
+    gym_apropiado = len(bloques_gym) == 1 and bloques_gym[0] == BLOQUES_GYM
+    puntaje_gym = 0
+    if gym_apropiado:
+        indice_bloque_inicio_gym = horario_dia.index("Gym")
+        if a_bloque("06:00") <= indice_bloque_inicio_gym < a_bloque("08:00"):
+            puntaje_gym += 15
+        elif a_bloque("18:00") <= indice_bloque_inicio_gym < a_bloque("20:00"):
+            puntaje_gym += 10
+        elif indice_bloque_inicio_gym < a_bloque("06:00") or indice_bloque_inicio_gym > a_bloque("21:00"):
+            puntaje_gym -= 30
+    if len(bloques_gym) > 1:
+        puntaje_gym -= 100 * len(bloques_gym)
+    for bloque in bloques_gym:
+        if bloque != BLOQUES_GYM and bloque > 0:
+            puntaje_gym -= 50
+
+    return ResumenDia(violacion, puntaje_sueno, sum(bloques_sueno), gym_apropiado, puntaje_gym, sum(bloques_gym),
+                      horario_dia.count("Estudio"), len(longitudes_contiguas(horario_dia, "Estudio")),
+                      horario_dia.count("Social"))
+
+
+def combinar_resumenes(resumenes, objetivo_bloques_estudio):
+    """Suma los 7 ResumenDia y aplica los términos semanales de aptitud_mejorada"""
+    if any(r.violacion for r in resumenes):
+        return -1e6
+
+    puntaje = 0
+    total_bloques_sueno = 0
+    for r in resumenes:
+        puntaje += r.puntaje_sueno
+        total_bloques_sueno += r.bloques_sueno
+
+    if not (BLOQUES_SUENO_MIN * 7 <= total_bloques_sueno <= BLOQUES_SUENO_MAX * 7):
+        puntaje -= 50 * abs(total_bloques_sueno - ((BLOQUES_SUENO_MIN + BLOQUES_SUENO_MAX) / 2 * 7)) / 2
+
+    dias_con_gym_apropiado = sum(r.gym_apropiado for r in resumenes)
+    if dias_con_gym_apropiado == 2:
+        puntaje += 150
+    elif dias_con_gym_apropiado == 1:
+        puntaje += 50
+    else:
+        puntaje -= 100
+
+    total_bloques_gym = sum(r.bloques_gym for r in resumenes)
+    bloques_gym_esperados = 2 * BLOQUES_GYM
+    if total_bloques_gym != bloques_gym_esperados:
+        puntaje -= abs(total_bloques_gym - bloques_gym_esperados) * 20
+
+    puntaje += sum(r.puntaje_gym for r in resumenes)
+
+    bloques_estudio = sum(r.bloques_estudio for r in resumenes)
+    if bloques_estudio == objetivo_bloques_estudio:
+        puntaje += 100
+    elif bloques_estudio > objetivo_bloques_estudio:
+        puntaje -= 20 * (bloques_estudio - objetivo_bloques_estudio)
+    else:
+        puntaje -= 30 * (objetivo_bloques_estudio - bloques_estudio)
+
+    total_bloques_estudio = sum(r.tramos_estudio for r in resumenes)
+    if total_bloques_estudio > (objetivo_bloques_estudio / BLOQUES_ESTUDIO) * 2:
+        puntaje -= 10 * (total_bloques_estudio - (objetivo_bloques_estudio / BLOQUES_ESTUDIO) * 2)
+
+    bloques_social = sum(r.bloques_social for r in resumenes)
+    if bloques_social > 0:
+        puntaje += min(30, bloques_social * 0.2)
+
+    return puntaje
+
+
+def aptitud_por_dias(horario, base, objetivo_bloques_estudio):
+    """Evaluación completa descompuesta: devuelve (puntaje, resúmenes por día)"""
+    resumenes = [resumen_dia(horario, base, indice_dia) for indice_dia in range(7)]
+    return combinar_resumenes(resumenes, objetivo_bloques_estudio), resumenes
+
+
+def actualizar_aptitud(horario, base, objetivo_bloques_estudio, resumenes, dias, verificar=False):
+    """Recalcula solo los días indicados partiendo de resúmenes previos.
+
+    Con verificar=True compara el resultado con aptitud_mejorada y lanza
+    AssertionError si difieren (modo depuración)."""
+    resumenes = list(resumenes)
+    for indice_dia in dias:
+        resumenes[indice_dia] = resumen_dia(horario, base, indice_dia)
+    puntaje = combinar_resumenes(resumenes, objetivo_bloques_estudio)
+    if verificar:
+        completo = aptitud_mejorada(horario, base, objetivo_bloques_estudio)
+        if puntaje != completo:
+            raise AssertionError(f"Aptitud incremental {puntaje} distinta de la completa {completo} "
+                                 f"(días recalculados: {sorted(dias)})")
+    return puntaje, resumenes
+
+
+def dias_modificados(antes, despues):
+    """Índices de los días cuyo contenido cambió entre dos horarios"""
+    return {indice_dia for indice_dia in range(7)
+            if obtener_horario_dia(antes, indice_dia) != obtener_horario_dia(despues, indice_dia)}
+
+
 def mutar_mejorado(horario, base, pm=0.03):
     """Mutación mejorada que respeta patrones naturales y PROTEGE el gym"""
     s = horario[:]
@@ -436,24 +668,77 @@ def mutar_mejorado(horario, base, pm=0.03):
     return s
 
 
-def ejecutar_ga_mejorado(partidos, materias, tam_poblacion=100, generaciones=400, elite=15, pm=0.04, pc=0.9):
-    """Algoritmo genético mejorado"""
+def ejecutar_ga_mejorado(partidos, materias, tam_poblacion=100, generaciones=400, elite=15, pm=0.04, pc=0.9,
+                         vectorizado=False, tam_cache=2048, incremental=False, verificar_incremental=False,
+                         procesos=1):
+    """Algoritmo genético mejorado
+
+    Con vectorizado=True la población se codifica como matriz numpy y se evalúa
+    completa con aptitud_poblacion (mismos puntajes, ~10× más rápido); sortea con
+    un generador de numpy sembrado desde random, así que con la misma semilla da
+    otros horarios que el bucle clásico, y no usa CacheAptitud (ignora tam_cache).
+    tam_cache acota la CacheAptitud que evita re-evaluar élites y clones
+    (0 la desactiva). Con incremental=True cada hijo recalcula solo los días
+    que tocaron el cruce y la mutación; verificar_incremental lo contrasta
+    contra aptitud_mejorada en cada hijo. Con procesos > 1 el bucle clásico
+    reparte la evaluación entre un EvaluadorParalelo (mismos resultados)."""
+    if procesos > 1 and (vectorizado or incremental):
+        raise ValueError("procesos > 1 solo aplica al bucle clásico (sin vectorizado ni incremental)")
     base, objetivo_bloques_estudio = construir_base_y_objetivos(partidos, materias)
+    if vectorizado:
+        return _ejecutar_ga_vectorizado(base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc)
+    if incremental:
+        return _ejecutar_ga_incremental(base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc,
+                                        verificar_incremental)
     poblacion = [sembrar_horario_mejorado(base, objetivo_bloques_estudio) for _ in range(tam_poblacion)]
-    mejor_individuo, mejor_puntaje = None, -1e18
+    cache = CacheAptitud(base, objetivo_bloques_estudio, tam_cache) if tam_cache > 0 else None
+    evaluador = EvaluadorParalelo(base, objetivo_bloques_estudio, procesos) if procesos > 1 else None
 
     print(f"Ejecutando GA mejorado: {generaciones} generaciones, población {tam_poblacion}")
 
+    try:
+        mejor_individuo, mejor_puntaje = _bucle_ga_clasico(
+            poblacion, base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc, cache, evaluador)
+    finally:
+        if evaluador is not None:
+            evaluador.cerrar()
+
+    print(f"Mejor aptitud final: {mejor_puntaje:.1f}")
+    if cache is not None:
+        print(f"Cache de aptitud: {cache.tasa_aciertos:.1%} aciertos "
+              f"({cache.aciertos} de {cache.aciertos + cache.fallos} evaluaciones)")
+    return mejor_individuo, base
+
+
+def _bucle_ga_clasico(poblacion, base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc,
+                      cache, evaluador, migrar=None, reportar=print):
+    """Generaciones del GA sobre listas de etiquetas; devuelve (mejor individuo, mejor puntaje)
+
+    migrar(gen, puntuados), si se da, recibe la población ordenada y devuelve
+    la que participará en la selección (el modelo de islas la usa para
+    intercambiar individuos); reportar recibe las líneas de progreso."""
+    mejor_individuo, mejor_puntaje = None, -1e18
+    evaluar_lote = evaluador.evaluar if evaluador is not None else None
+
     for gen in range(generaciones):
-        puntuados = [(aptitud_mejorada(ind, base, objetivo_bloques_estudio), ind) for ind in poblacion]
+        if cache is not None:
+            puntuados = list(zip(cache.aptitudes(poblacion, evaluar_lote), poblacion))
+            tasa_gen = cache.cerrar_generacion()
+        elif evaluar_lote is not None:
+            puntuados = list(zip(evaluar_lote(poblacion), poblacion))
+        else:
+            puntuados = [(aptitud_mejorada(ind, base, objetivo_bloques_estudio), ind) for ind in poblacion]
         puntuados.sort(key=lambda x: x[0], reverse=True)
+        if migrar is not None:
+            puntuados = migrar(gen, puntuados)
 
         if puntuados[0][0] > mejor_puntaje:
             mejor_puntaje = puntuados[0][0]
             mejor_individuo = puntuados[0][1]
 
         if gen % 50 == 0:
-            print(f"Generación {gen}: Mejor aptitud = {mejor_puntaje:.1f}")
+            detalle_cache = f" (cache: {tasa_gen:.0%} aciertos)" if cache is not None else ""
+            reportar(f"Generación {gen}: Mejor aptitud = {mejor_puntaje:.1f}{detalle_cache}")
 
         nueva_poblacion = [ind for _, ind in puntuados[:elite]]
 
@@ -465,14 +750,66 @@ def ejecutar_ga_mejorado(partidos, materias, tam_poblacion=100, generaciones=400
 
         poblacion = nueva_poblacion
 
+    return mejor_individuo, mejor_puntaje
+
+
+def _ejecutar_ga_incremental(base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc, verificar):
+    """Bucle del GA con aptitud por días; consume el azar igual que el bucle clásico"""
+    poblacion = [sembrar_horario_mejorado(base, objetivo_bloques_estudio) for _ in range(tam_poblacion)]
+    puntuados = []
+    for ind in poblacion:
+        puntaje, resumenes = aptitud_por_dias(ind, base, objetivo_bloques_estudio)
+        puntuados.append((puntaje, ind, resumenes))
+    mejor_individuo, mejor_puntaje = None, -1e18
+    dias_recalculados = 0
+
+    print(f"Ejecutando GA mejorado (incremental): {generaciones} generaciones, población {tam_poblacion}")
+
+    for gen in range(generaciones):
+        puntuados.sort(key=lambda x: x[0], reverse=True)
+
+        if puntuados[0][0] > mejor_puntaje:
+            mejor_puntaje = puntuados[0][0]
+            mejor_individuo = puntuados[0][1]
+
+        if gen % 50 == 0:
+            print(f"Generación {gen}: Mejor aptitud = {mejor_puntaje:.1f}")
+
+        nueva_poblacion = puntuados[:elite]
+
+        while len(nueva_poblacion) < tam_poblacion:
+            p1, p2 = random.sample(puntuados[:30], 2)
+            if random.random() < pc:
+                hijo, corte = cruce_con_corte(p1[1], p2[1])
+                dia_corte, desfase = divmod(corte, BLOQUES_POR_DIA)
+                resumenes = p1[2][:dia_corte] + p2[2][dia_corte:]
+                tocados = {dia_corte} if desfase else set()
+            else:
+                hijo, resumenes, tocados = p1[1][:], p1[2], set()
+            mutado = mutar_mejorado(hijo, base, pm)
+            tocados |= dias_modificados(hijo, mutado)
+            dias_recalculados += len(tocados)
+            puntaje, resumenes = actualizar_aptitud(mutado, base, objetivo_bloques_estudio, resumenes, tocados,
+                                                    verificar)
+            nueva_poblacion.append((puntaje, mutado, resumenes))
+
+        puntuados = nueva_poblacion
+
+    hijos = max(1, generaciones * (tam_poblacion - elite))
     print(f"Mejor aptitud final: {mejor_puntaje:.1f}")
+    print(f"Días recalculados por hijo: {dias_recalculados / hijos:.2f} de 7")
     return mejor_individuo, base
 
 
 def cruce(p1, p2):
     """Cruzamiento mejorado"""
+    return cruce_con_corte(p1, p2)[0]
+
+
+def cruce_con_corte(p1, p2):
+    """Igual que cruce pero devuelve también el punto de corte: (hijo, corte)"""
     corte = random.randint(1, TOTAL_BLOQUES - 2)
-    return p1[:corte] + p2[corte:]
+    return p1[:corte] + p2[corte:], corte
 
 
 def longitudes_contiguas(vec, etiqueta):
@@ -490,6 +827,354 @@ def longitudes_contiguas(vec, etiqueta):
     return longitudes
 
 
+# -----------------------------
+# GA vectorizado (numpy)
+# -----------------------------
+# Cada horario se codifica como una fila de 336 enteros pequeños (uint8); la
+# población completa es una matriz (tam_poblacion × TOTAL_BLOQUES).
+ACTIVIDADES = [""] + ETIQUETAS_FIJAS + ETIQUETAS_FLEXIBLES
+CODIGO_ACTIVIDAD = {etiqueta: codigo for codigo, etiqueta in enumerate(ACTIVIDADES)}
+CODIGOS_FIJOS = np.array([CODIGO_ACTIVIDAD[e] for e in ETIQUETAS_FIJAS], dtype=np.uint8)
+CODIGOS_FLEXIBLES = np.array([CODIGO_ACTIVIDAD[e] for e in ETIQUETAS_FLEXIBLES], dtype=np.uint8)
+COD_SUENO = CODIGO_ACTIVIDAD["Sueño"]
+COD_ESTUDIO = CODIGO_ACTIVIDAD["Estudio"]
+COD_GYM = CODIGO_ACTIVIDAD["Gym"]
+COD_SOCIAL = CODIGO_ACTIVIDAD["Social"]
+
+
+def _tablas_por_bloque():
+    """Precalcula, por bloque del día, el peso horario del sueño y los pesos de mutación"""
+    peso_sueno = np.zeros(BLOQUES_POR_DIA)
+    pesos_mutacion = np.zeros((BLOQUES_POR_DIA, len(ETIQUETAS_FLEXIBLES)))
+    for indice_bloque in range(BLOQUES_POR_DIA):
+        if indice_bloque >= a_bloque("22:00") or indice_bloque < a_bloque("08:00"):
+            peso_sueno[indice_bloque] = 5
+        elif a_bloque("10:00") <= indice_bloque < a_bloque("18:00"):
+            peso_sueno[indice_bloque] = -15
+
+        # Mismo orden de condiciones que mutar_mejorado
+        if a_bloque("22:00") <= indice_bloque or indice_bloque < a_bloque("08:00"):
+            pesos_mutacion[indice_bloque] = [0.85, 0.05, 0.0, 0.1]
+        elif a_bloque("06:00") <= indice_bloque < a_bloque("08:00"):
+            pesos_mutacion[indice_bloque] = [0.2, 0.3, 0.3, 0.2]
+        else:
+            pesos_mutacion[indice_bloque] = [0.05, 0.45, 0.1, 0.4]
+    return peso_sueno, np.cumsum(pesos_mutacion, axis=1)
+
+
+PESO_SUENO_BLOQUE, PESOS_MUTACION_ACUMULADOS = _tablas_por_bloque()
+BLOQUE_DEL_DIA = np.arange(TOTAL_BLOQUES) % BLOQUES_POR_DIA
+SUENO_NOCTURNO = (BLOQUE_DEL_DIA >= a_bloque("22:00")) | (BLOQUE_DEL_DIA < a_bloque("08:00"))
+
+
+def codificar_horario(horario):
+    """Convierte un horario (lista de etiquetas) en un vector uint8 de códigos"""
+    return np.array([CODIGO_ACTIVIDAD[x] for x in horario], dtype=np.uint8)
+
+
+def decodificar_horario(fila):
+    """Convierte un vector de códigos de vuelta a la lista de etiquetas"""
+    return [ACTIVIDADES[c] for c in fila.tolist()]
+
+
+def codificar_poblacion(poblacion):
+    """Apila una lista de horarios en una matriz (tam_poblacion × TOTAL_BLOQUES)"""
+    return np.array([[CODIGO_ACTIVIDAD[x] for x in horario] for horario in poblacion], dtype=np.uint8)
+
+
+def _corridas(mascara):
+    """Devuelve (fila, inicio, longitud) de cada tramo contiguo de True en una matriz 2D"""
+    borde = np.zeros((mascara.shape[0], 1), dtype=np.int8)
+    cambios = np.diff(np.concatenate([borde, mascara.astype(np.int8), borde], axis=1), axis=1)
+    filas, inicios = np.nonzero(cambios == 1)
+    _, fines = np.nonzero(cambios == -1)
+    return filas, inicios, fines - inicios
+
+
+def _gym_por_dia(dias):
+    """Corridas de gym por día: (cantidad, corridas de longitud != BLOQUES_GYM, inicio si hay una sola)"""
+    filas, inicios, longitudes = _corridas(dias == COD_GYM)
+    n = dias.shape[0]
+    cantidad = np.bincount(filas, minlength=n)
+    irregulares = np.bincount(filas, weights=longitudes != BLOQUES_GYM, minlength=n)
+    inicio = np.full(n, -1)
+    inicio[filas] = inicios
+    return cantidad, irregulares, inicio
+
+
+def aptitud_poblacion(poblacion, base, objetivo_bloques_estudio):
+    """Evalúa toda la población codificada a la vez; equivale fila a fila a aptitud_mejorada"""
+    poblacion = np.asarray(poblacion, dtype=np.uint8)
+    base = base if isinstance(base, np.ndarray) else codificar_horario(base)
+    tam = poblacion.shape[0]
+    dias = poblacion.reshape(tam * 7, BLOQUES_POR_DIA)
+
+    # Sueño: corridas por día, posición horaria y total semanal
+    es_sueno = dias == COD_SUENO
+    filas, _, longitudes = _corridas(es_sueno)
+    corridas_sueno = np.bincount(filas, minlength=tam * 7)
+    en_rango = (longitudes >= BLOQUES_SUENO_MIN) & (longitudes <= BLOQUES_SUENO_MAX)
+    valor = np.where(en_rango, 100.0,
+                     -30.0 * np.abs(longitudes - (BLOQUES_SUENO_MIN + BLOQUES_SUENO_MAX) / 2))
+    sueno_dia = np.bincount(filas, weights=valor, minlength=tam * 7)
+    sueno_dia += es_sueno @ PESO_SUENO_BLOQUE
+    sueno_dia -= 80 * np.maximum(corridas_sueno - 1, 0)
+    sueno_dia = np.where(corridas_sueno == 0, -200.0, sueno_dia)
+    puntaje = sueno_dia.reshape(tam, 7).sum(axis=1)
+
+    total_sueno = es_sueno.reshape(tam, TOTAL_BLOQUES).sum(axis=1)
+    fuera = (total_sueno < BLOQUES_SUENO_MIN * 7) | (total_sueno > BLOQUES_SUENO_MAX * 7)
+    puntaje -= np.where(fuera, 50 * np.abs(total_sueno - ((BLOQUES_SUENO_MIN + BLOQUES_SUENO_MAX) / 2 * 7)) / 2, 0)
+
+    # Gym: un único tramo de BLOQUES_GYM por día, en horario preferido
+    corridas_gym, irregulares, inicio = _gym_por_dia(dias)
+    apropiado = (corridas_gym == 1) & (irregulares == 0)
+    horario_gym = np.select(
+        [(inicio >= a_bloque("06:00")) & (inicio < a_bloque("08:00")),
+         (inicio >= a_bloque("18:00")) & (inicio < a_bloque("20:00")),
+         (inicio < a_bloque("06:00")) | (inicio > a_bloque("21:00"))],
+        [15, 10, -30], 0)
+    horario_gym = np.where(apropiado, horario_gym, 0)
+    penalizacion_gym = np.where(corridas_gym > 1, -100 * corridas_gym, 0) - 50 * irregulares
+
+    dias_apropiados = apropiado.reshape(tam, 7).sum(axis=1)
+    puntaje += np.select([dias_apropiados == 2, dias_apropiados == 1], [150, 50], -100)
+    total_gym = (poblacion == COD_GYM).sum(axis=1)
+    puntaje -= np.abs(total_gym - 2 * BLOQUES_GYM) * 20
+    puntaje += (horario_gym + penalizacion_gym).reshape(tam, 7).sum(axis=1)
+
+    # Estudio: total de bloques y fragmentación
+    es_estudio = poblacion == COD_ESTUDIO
+    bloques_estudio = es_estudio.sum(axis=1)
+    puntaje += np.where(bloques_estudio == objetivo_bloques_estudio, 100,
+                        np.where(bloques_estudio > objetivo_bloques_estudio,
+                                 -20 * (bloques_estudio - objetivo_bloques_estudio),
+                                 -30 * (objetivo_bloques_estudio - bloques_estudio)))
+    filas, _, _ = _corridas(es_estudio.reshape(tam * 7, BLOQUES_POR_DIA))
+    tramos_estudio = np.bincount(filas // 7, minlength=tam)
+    limite = (objetivo_bloques_estudio / BLOQUES_ESTUDIO) * 2
+    puntaje -= np.where(tramos_estudio > limite, 10 * (tramos_estudio - limite), 0)
+
+    # Social al final, igual que en la versión escalar (es el único término no exacto)
+    bloques_social = (poblacion == COD_SOCIAL).sum(axis=1)
+    puntaje += np.where(bloques_social > 0, np.minimum(30, bloques_social * 0.2), 0)
+
+    fijo = np.isin(base, CODIGOS_FIJOS)
+    violaciones = ((poblacion != base) & fijo).any(axis=1)
+    return np.where(violaciones, -1e6, puntaje)
+
+
+def cruce_poblacion(padres1, padres2, rng):
+    """Cruce de un punto para cada par de filas (mismo rango de corte que cruce)"""
+    cortes = rng.integers(1, TOTAL_BLOQUES - 1, size=padres1.shape[0])
+    return np.where(np.arange(TOTAL_BLOQUES) < cortes[:, None], padres1, padres2)
+
+
+def mutar_poblacion(poblacion, base, pm, rng):
+    """Versión por lotes de mutar_mejorado: mismas protecciones y mismos pesos por franja horaria"""
+    s = poblacion.copy()
+    tam = s.shape[0]
+
+    corridas_gym, irregulares, _ = _gym_por_dia(s.reshape(tam * 7, BLOQUES_POR_DIA))
+    gym_protegido = np.repeat(((corridas_gym == 1) & (irregulares == 0)).reshape(tam, 7), BLOQUES_POR_DIA, axis=1)
+
+    mutan = (rng.random(s.shape) < pm) & ~np.isin(base, CODIGOS_FIJOS)
+    mutan &= ~((s == COD_GYM) & gym_protegido)
+    mutan &= ~((s == COD_SUENO) & SUENO_NOCTURNO)
+
+    filas, columnas = np.nonzero(mutan)
+    acumulados = PESOS_MUTACION_ACUMULADOS[BLOQUE_DEL_DIA[columnas]]
+    sorteo = rng.random(len(columnas)) * acumulados[:, -1]
+    elegida = np.minimum((acumulados <= sorteo[:, None]).sum(axis=1), len(ETIQUETAS_FLEXIBLES) - 1)
+    s[filas, columnas] = CODIGOS_FLEXIBLES[elegida]
+    return s
+
+
+def _ejecutar_ga_vectorizado(base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc):
+    """Bucle del GA sobre la población codificada; mismos operadores que ejecutar_ga_mejorado"""
+    rng = np.random.default_rng(random.getrandbits(64))
+    base_cod = codificar_horario(base)
+    poblacion = codificar_poblacion(
+        [sembrar_horario_mejorado(base, objetivo_bloques_estudio) for _ in range(tam_poblacion)])
+    mejor_individuo, mejor_puntaje = None, -1e18
+    n_hijos = tam_poblacion - elite
+    n_padres = min(30, tam_poblacion)
+
+    print(f"Ejecutando GA mejorado (vectorizado): {generaciones} generaciones, población {tam_poblacion}")
+
+    for gen in range(generaciones):
+        puntajes = aptitud_poblacion(poblacion, base_cod, objetivo_bloques_estudio)
+        orden = np.argsort(-puntajes, kind="stable")
+
+        if puntajes[orden[0]] > mejor_puntaje:
+            mejor_puntaje = float(puntajes[orden[0]])
+            mejor_individuo = poblacion[orden[0]].copy()
+
+        if gen % 50 == 0:
+            print(f"Generación {gen}: Mejor aptitud = {mejor_puntaje:.1f}")
+
+        # Dos padres distintos entre los n_padres mejores, como random.sample(puntuados[:30], 2)
+        i = rng.integers(0, n_padres, size=n_hijos)
+        j = rng.integers(0, n_padres - 1, size=n_hijos)
+        j += j >= i
+        padres1, padres2 = poblacion[orden[i]], poblacion[orden[j]]
+
+        cruzan = rng.random(n_hijos) < pc
+        hijos = np.where(cruzan[:, None], cruce_poblacion(padres1, padres2, rng), padres1)
+        hijos = mutar_poblacion(hijos, base_cod, pm, rng)
+        poblacion = np.concatenate([poblacion[orden[:elite]], hijos])
+
+    print(f"Mejor aptitud final: {mejor_puntaje:.1f}")
+    return decodificar_horario(mejor_individuo), base
+
+
+# -----------------------------
+# Evaluación paralela
+# -----------------------------
+# Estado de cada proceso trabajador: la base y el objetivo llegan una sola vez
+# (initializer del pool) y los horarios viajan como bytes uint8.
+_TRABAJADOR = {}
+
+
+def _inicializar_trabajador(base, objetivo_bloques_estudio):
+    _TRABAJADOR["base"] = base
+    _TRABAJADOR["objetivo"] = objetivo_bloques_estudio
+
+
+def _evaluar_lote_codificado(datos):
+    filas = np.frombuffer(datos, dtype=np.uint8).reshape(-1, TOTAL_BLOQUES)
+    base, objetivo = _TRABAJADOR["base"], _TRABAJADOR["objetivo"]
+    return [aptitud_mejorada(decodificar_horario(fila), base, objetivo) for fila in filas]
+
+
+class EvaluadorParalelo:
+    """Reparte aptitud_mejorada de una población entre un pool de procesos.
+
+    La población se divide en lotes contiguos (uno por proceso) y los
+    resultados se reensamblan en orden, así los puntajes no dependen del
+    número de procesos. Usar como context manager o llamar a cerrar().
+
+    Cada generación paga un pool.map (codificar, enviar y recibir lotes): en
+    una máquina de un núcleo, 400 individuos tardan 0.12 s en serie y 0.15 s
+    con el pool. Conviene solo con varios núcleos reales y cuando la
+    evaluación de una generación (≈0.3 ms por fallo de la cache) supera
+    claramente ese costo fijo: poblaciones de cientos de individuos o una
+    aptitud más cara. Por eso procesos=1 sigue siendo el valor por omisión."""
+
+    def __init__(self, base, objetivo_bloques_estudio, procesos=None):
+        procesos = procesos or os.cpu_count() or 1
+        if procesos < 1:
+            raise ValueError("El número de procesos debe ser al menos 1")
+        self.procesos = procesos
+        self._pool = multiprocessing.Pool(procesos, initializer=_inicializar_trabajador,
+                                          initargs=(base, objetivo_bloques_estudio))
+
+    def evaluar(self, poblacion):
+        if not poblacion:
+            return []
+        matriz = codificar_poblacion(poblacion)
+        lotes = [lote.tobytes() for lote in np.array_split(matriz, min(self.procesos, len(poblacion)))]
+        return [puntaje for resultado in self._pool.map(_evaluar_lote_codificado, lotes) for puntaje in resultado]
+
+    def cerrar(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# -----------------------------
+# Modelo de islas
+# -----------------------------
+def _ejecutar_isla(indice, semilla, base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc,
+                   tam_cache, intervalo_migracion, migrantes, entrada, salida, mensajes):
+    """Proceso de una isla: GA clásico propio con migración en anillo hacia la isla siguiente"""
+    try:
+        random.seed(semilla)
+        poblacion = [sembrar_horario_mejorado(base, objetivo_bloques_estudio) for _ in range(tam_poblacion)]
+        cache = CacheAptitud(base, objetivo_bloques_estudio, tam_cache) if tam_cache > 0 else None
+
+        def migrar(gen, puntuados):
+            if gen == 0 or gen % intervalo_migracion:
+                return puntuados
+            # Se envía primero y se recibe después: todas las islas publican antes de
+            # bloquearse, así el anillo no se traba y la migración es síncrona
+            salida.put([(puntaje, codificar_horario(ind).tobytes()) for puntaje, ind in puntuados[:migrantes]])
+            llegados = [(puntaje, decodificar_horario(np.frombuffer(datos, dtype=np.uint8)))
+                        for puntaje, datos in entrada.get()]
+            puntuados = puntuados[:len(puntuados) - len(llegados)] + llegados
+            puntuados.sort(key=lambda x: x[0], reverse=True)
+            return puntuados
+
+        mejor_individuo, mejor_puntaje = _bucle_ga_clasico(
+            poblacion, base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc, cache, None,
+            migrar=migrar if migrantes > 0 else None,
+            reportar=lambda texto: mensajes.put(("progreso", indice, texto)))
+        mensajes.put(("fin", indice, mejor_puntaje, codificar_horario(mejor_individuo).tobytes()))
+    except Exception as e:
+        mensajes.put(("error", indice, repr(e)))
+
+
+def ejecutar_ga_islas(partidos, materias, islas=4, tam_poblacion=100, generaciones=400, elite=15, pm=0.04, pc=0.9,
+                      intervalo_migracion=25, migrantes=2, tam_cache=2048):
+    """GA con modelo de islas: una subpoblación por proceso y migración periódica.
+
+    Cada isla corre el bucle clásico (siembra, cruce, mutar_mejorado) con su
+    propia semilla, derivada de random para que random.seed reproduzca la
+    corrida. Cada intervalo_migracion generaciones envía sus `migrantes`
+    mejores a la isla siguiente del anillo, que reemplazan a sus peores."""
+    if islas < 1:
+        raise ValueError("Se necesita al menos una isla")
+    if intervalo_migracion < 1:
+        raise ValueError("El intervalo de migración debe ser al menos 1")
+    if not 0 <= migrantes <= tam_poblacion - elite:
+        raise ValueError("El número de migrantes debe estar entre 0 y tam_poblacion - elite")
+    base, objetivo_bloques_estudio = construir_base_y_objetivos(partidos, materias)
+    semillas = [random.getrandbits(64) for _ in range(islas)]
+    if islas == 1:
+        migrantes = 0
+
+    colas = [multiprocessing.Queue() for _ in range(islas)]
+    mensajes = multiprocessing.Queue()
+    procesos = [multiprocessing.Process(
+        target=_ejecutar_isla,
+        args=(i, semillas[i], base, objetivo_bloques_estudio, tam_poblacion, generaciones, elite, pm, pc,
+              tam_cache, intervalo_migracion, migrantes, colas[i], colas[(i + 1) % islas], mensajes))
+        for i in range(islas)]
+
+    print(f"Ejecutando GA por islas: {islas} islas × población {tam_poblacion}, {generaciones} generaciones, "
+          f"migración de {migrantes} cada {intervalo_migracion}")
+    for proceso in procesos:
+        proceso.start()
+
+    resultados = {}
+    try:
+        while len(resultados) < islas:
+            mensaje = mensajes.get()
+            if mensaje[0] == "progreso":
+                print(f"[Isla {mensaje[1]}] {mensaje[2]}")
+            elif mensaje[0] == "fin":
+                resultados[mensaje[1]] = (mensaje[2], mensaje[3])
+            else:
+                raise RuntimeError(f"La isla {mensaje[1]} falló: {mensaje[2]}")
+    finally:
+        for proceso in procesos:
+            if len(resultados) < islas:
+                proceso.terminate()
+            proceso.join()
+
+    for i in range(islas):
+        print(f"Isla {i}: mejor aptitud = {resultados[i][0]:.1f}")
+    mejor_isla = max(range(islas), key=lambda i: resultados[i][0])
+    mejor_puntaje, datos = resultados[mejor_isla]
+    print(f"Mejor aptitud final: {mejor_puntaje:.1f} (isla {mejor_isla})")
+    return decodificar_horario(np.frombuffer(datos, dtype=np.uint8)), base
+
+
 # -----------------------------
 # Exportación
 # -----------------------------
@@ -512,7 +1197,8 @@ if __name__ == "__main__":
     partidos = pedir_partidos()
     materias = entrada_entero("¿Cuántas materias necesitas estudiar esta semana? ", 0, 10)
 
-    mejor, base = ejecutar_ga_mejorado(partidos, materias)
+    # --vectorizado activa el GA sobre numpy (más rápido, otra secuencia aleatoria)
+    mejor, base = ejecutar_ga_mejorado(partidos, materias, vectorizado="--vectorizado" in sys.argv[1:])
     df_mejor = matriz_horario_a_df(mejor)
 
     imprimir_matriz(df_mejor)